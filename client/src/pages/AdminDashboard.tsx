@@ -120,7 +120,8 @@ interface Revision {
 }
 
 interface ChatMessage {
-  id: number
+  id: number | null  // null until the server's chat_ack for messages sent over the socket
+  client_id?: string
   message: string
   file?: string
   file_name?: string
@@ -227,6 +228,9 @@ const Toast = ({ title, description, variant }: { title: string; description: st
   )
 }
 
+// Compact task rows, with the files and revisions the list shows
+const TASK_LIST_URL = '/api/tasks/?view=summary&expand=files,revisions'
+
 //WebSocket Hook with JWT Token Authentication
 const useWebSocketWithReconnect = (url: string | null, onMessage: (data: any) => void, deps: any[] = []) => {
   const [ws, setWs] = useState<WebSocket | null>(null);
@@ -396,8 +400,13 @@ export default function AdminDashboard() {
       if (data.type === 'chat_message' && data.message) {
         // Add new chat message to the chat in real-time
         setChatMessages(prev => {
-          const filtered = prev.filter(msg => !(msg.id > 1000000 && msg.message === data.message.message)); // Remove temp IDs
-          return [...filtered, data.message];
+          const incoming = data.message;
+          // A message seen before (same client_id) is replaced, not repeated
+          const filtered = prev.filter(msg =>
+            !(incoming.client_id && msg.client_id === incoming.client_id) &&
+            !(msg.id !== null && msg.id > 1000000 && msg.message === incoming.message) // Remove temp IDs
+          );
+          return [...filtered, incoming];
         });
         
         // Auto-scroll to bottom
@@ -406,6 +415,14 @@ export default function AdminDashboard() {
         }, 100);
       }
       
+      if (data.type === 'chat_ack' && data.messages) {
+        // Messages sent over the socket are broadcast with id null; their ids come once stored
+        setChatMessages(prev => prev.map(msg => {
+          const ack = data.messages.find((a: any) => msg.client_id && a.client_id === msg.client_id);
+          return ack ? { ...msg, id: ack.id, created_at: ack.created_at } : msg;
+        }));
+      }
+
       if (data.type === 'user_typing') {
         // Handle typing indicators
         if (data.username !== currentUser?.username) {
@@ -427,10 +444,11 @@ export default function AdminDashboard() {
     loadInitialData()
   }, [])
 
-  // Load chat messages when selected task changes
+  // Load chat messages and full details when selected task changes
   useEffect(() => {
     if (selectedTask) {
       loadChatMessages(selectedTask.id);
+      loadTaskDetail(selectedTask.id);
       // Reset chat messages when task changes
       setChatMessages([]);
     }
@@ -448,8 +466,8 @@ export default function AdminDashboard() {
       const userData = await apiService.get<User>('/api/auth/user/')
       setCurrentUser(userData)
 
-      // Load tasks
-      const tasksData = await apiService.get<Task[]>('/api/tasks/')
+      // Load tasks (summary rows; the selected task is loaded in full below)
+      const tasksData = await apiService.get<Task[]>(TASK_LIST_URL)
       setTasks(tasksData)
       if (tasksData.length > 0) {
         setSelectedTask(tasksData[0])
@@ -468,6 +486,16 @@ export default function AdminDashboard() {
     }
   }
 
+  // Client profile, reasons and estimates of the selected task aren't in the list rows
+  const loadTaskDetail = async (taskId: number) => {
+    try {
+      const task = await apiService.get<Task>(`/api/tasks/${taskId}/`)
+      setSelectedTask(prev => (prev && prev.id === taskId ? { ...prev, ...task } : prev))
+    } catch (error) {
+      console.error('Failed to load task details:', error)
+    }
+  }
+
   const loadStats = async () => {
     try {
       const statsData = await apiService.get<{
@@ -1477,7 +1505,7 @@ export default function AdminDashboard() {
                         <>
                           {chatMessages.map((message) => (
                             <div
-                              key={message.id}
+                              key={message.id ?? message.client_id}
                               className={`flex ${message.sender_role === 'admin' ? 'justify-end' : 'justify-start'}`}
                             >
                               <div
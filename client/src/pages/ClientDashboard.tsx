@@ -47,6 +47,9 @@ const Toast = ({ title, description, variant }: { title: string; description: st
 }
 
 
+// Compact task rows, with the files and revisions the list shows
+const TASK_LIST_URL = '/api/tasks/?view=summary&expand=files,revisions'
+
 //WebSocket Hook with JWT Token Authentication
 const useWebSocketWithReconnect = (url: string | null, onMessage: (data: any) => void, deps: any[] = []) => {
   const [ws, setWs] = useState<WebSocket | null>(null);
@@ -252,11 +255,14 @@ export default function ClientDashboard() {
       if (data.type === 'chat_message' && data.message) {
       // Add new chat message to the chat in real-time
       // Remove ONLY the matching optimistic temp message, not the whole history
+      // Messages sent over the socket arrive with id null and are matched by client_id
       setChatMessages(prev => {
+        const incoming = data.message;
         const filtered = prev.filter(
-          msg => !(msg.id > 1000000 && msg.message === data.message.message)
+          msg => !(incoming.client_id && msg.client_id === incoming.client_id) &&
+            !(msg.id != null && msg.id > 1000000 && msg.message === incoming.message)
         );
-        return [...filtered, data.message];
+        return [...filtered, incoming];
       });
 
       // Auto-scroll to bottom
@@ -265,7 +271,15 @@ export default function ClientDashboard() {
       }, 100);
     }
 
-     
+
+      if (data.type === 'chat_ack' && data.messages) {
+        // Database ids for messages broadcast before they were stored
+        setChatMessages(prev => prev.map(msg => {
+          const ack = data.messages.find((a: any) => msg.client_id && a.client_id === msg.client_id);
+          return ack ? { ...msg, id: ack.id, created_at: ack.created_at } : msg;
+        }));
+      }
+
       if (data.type === 'user_typing') {
         // Handle typing indicators
         if (data.username !== currentUser?.username) {
@@ -289,10 +303,11 @@ export default function ClientDashboard() {
   useEffect(() => {
     loadInitialData()
   }, [])
-  // Load chat messages when selected task changes
+  // Load chat messages and full details when selected task changes
   useEffect(() => {
     if (selectedTask) {
       loadChatMessages(selectedTask.id);
+      loadTaskDetail(selectedTask.id);
     }
   }, [selectedTask?.id])
   useEffect(() => {
@@ -305,8 +320,8 @@ export default function ClientDashboard() {
       // Load current user
       const userData = await apiService.get<any>('/api/auth/user/')
       setCurrentUser(userData)
-      // Load tasks
-      const tasksData = await apiService.get<any[]>('/api/tasks/')
+      // Load tasks (summary rows; the selected task is loaded in full below)
+      const tasksData = await apiService.get<any[]>(TASK_LIST_URL)
       setTasks(tasksData)
       if (tasksData.length > 0) {
         setSelectedTask(tasksData[0])
@@ -319,6 +334,15 @@ export default function ClientDashboard() {
       setLoading(false)
     }
   }
+  // Reasons and other detail fields of the selected task aren't in the list rows
+  const loadTaskDetail = async (taskId: number) => {
+    try {
+      const task = await apiService.get<any>(`/api/tasks/${taskId}/`)
+      setSelectedTask((prev: any) => (prev && prev.id === taskId ? { ...prev, ...task } : prev))
+    } catch (error) {
+      console.error('Failed to load task details:', error)
+    }
+  }
   const loadChatMessages = async (taskId: number) => {
     try {
       const messages = await apiService.get<any[]>(`/api/tasks/${taskId}/chat/`)
@@ -1394,7 +1418,7 @@ const requestRevision = async () => {
 
                             return (
                               <div
-                                key={message.id}
+                                key={message.id ?? message.client_id}
                                 className={`flex ${isMine ? 'justify-end' : 'justify-start'}`}
                               >
                                 <div
@@ -4,11 +4,24 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound, ValidationError
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from .models import Task, UserProfile, BudgetProposal
 from .serializers import TaskSerializer, UserSerializer, BudgetProposalSerializer
-from .views import IsAdmin  # Reuse your existing IsAdmin permission
+from .views import IsAdmin, task_list_serializer  # Reuse your existing IsAdmin permission
+from .pagination import TaskCursorPagination, UserCursorPagination, UserTaskPagination
+from .filters import TaskFilter
+from .fieldsets import fieldset_context, parse_csv_param, trim_fields
+from .cache import serialize_task
+from .bulk import BulkActionError, parse_bulk_request, run_bulk_action
+from .export import DATASETS, EXPORT_FORMATS, aiter_export, encode_export, export_rows
+from .filters import parse_moment
 
 
 # --------------------------------------------------------------------------- #
@@ -22,15 +35,38 @@ class AdminTaskViewSet(viewsets.ViewSet):
     """
     permission_classes = [IsAuthenticated, IsAdmin]
 
-    # GET /api/admin/tasks/
+    # GET /api/admin/tasks/  (?cursor= / ?page_size= for keyset pages, ?view=summary, ?fields= / ?expand=,
+    #                         ?status= / ?priority= / ... / ?sort= — see core.filters)
     def list(self, request):
-        tasks = Task.objects.all().order_by('-created_at')
-        return Response(TaskSerializer(tasks, many=True, context={'request': request}).data)
+        context = {'request': request, **fieldset_context(request)}
+        task_filter = TaskFilter(request)
+        serializer_class = task_list_serializer(request)
+        tasks = task_filter.filter_queryset(serializer_class(context=context).optimize_queryset(
+            Task.objects.all(), always=('created_at', 'deadline')
+        ))
+        paginator = TaskCursorPagination()
+        self.keyset_ordering = task_filter.ordering
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        if page is not None:
+            data = serializer_class(page, many=True, context=context).data
+            return paginator.get_paginated_response(data)
+        return Response(serializer_class(tasks, many=True, context=context).data)
 
     # GET /api/admin/tasks/<id>/
     def retrieve(self, request, pk=None):
-        task = get_object_or_404(Task, pk=pk)
-        return Response(TaskSerializer(task, context={'request': request}).data)
+        context = {'request': request, **fieldset_context(request)}
+        tasks = TaskSerializer(context=context).optimize_queryset(Task.objects.all())
+        task = get_object_or_404(tasks, pk=pk)
+        return Response(TaskSerializer(task, context=context).data)
+
+    # POST /api/admin/tasks/bulk/  {"action": ..., "ids": [...], "reason"?, "amount"?}
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        try:
+            action_name, ids, options = parse_bulk_request(request.data)
+        except BulkActionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(run_bulk_action(request, action_name, ids, options))
 
     # POST /api/admin/tasks/<id>/accept_new/
     @action(detail=True, methods=['post'])
@@ -39,7 +75,7 @@ class AdminTaskViewSet(viewsets.ViewSet):
         task.status = "In Progress"  # NO CHANGE to your existing statuses
         task.assigned_admin = request.user
         task.save()
-        return Response({"detail": "Task accepted", "task": TaskSerializer(task, context={'request': request}).data})
+        return Response({"detail": "Task accepted", "task": serialize_task(task, request)})
 
     # POST /api/admin/tasks/<id>/reject_new/
     @action(detail=True, methods=['post'])
@@ -49,7 +85,7 @@ class AdminTaskViewSet(viewsets.ViewSet):
         task.status = "Rejected"   # No change to your system
         task.reject_reason = reason
         task.save()
-        return Response({"detail": "Task rejected", "task": TaskSerializer(task, context={'request': request}).data})
+        return Response({"detail": "Task rejected", "task": serialize_task(task, request)})
 
     # POST /api/admin/tasks/<id>/mark_complete_new/
     @action(detail=True, methods=['post'])
@@ -57,7 +93,7 @@ class AdminTaskViewSet(viewsets.ViewSet):
         task = get_object_or_404(Task, pk=pk)
         task.status = "Completed"
         task.save()
-        return Response({"detail": "Task marked as completed", "task": TaskSerializer(task, context={'request': request}).data})
+        return Response({"detail": "Task marked as completed", "task": serialize_task(task, request)})
 
     # POST /api/admin/tasks/<id>/propose_budget_new/
     @action(detail=True, methods=['post'])
@@ -80,39 +116,116 @@ class AdminTaskViewSet(viewsets.ViewSet):
 # --------------------------------------------------------------------------- #
 # ADMIN USER MANAGEMENT (SAFE – DOES NOT TOUCH EXISTING LOGIC)
 # --------------------------------------------------------------------------- #
+def empty_task_stats():
+    return {"total": 0, "by_status": {}, "total_spend": "0.00"}
+
+
+def client_task_stats(user_ids):
+    """
+    {user_id: {"total", "by_status", "total_spend"}} from one GROUP BY over the
+    clients' tasks. Spend sums `budget` over completed tasks: Task.save sets it
+    to the accepted amount (proposed_budget or admin_counter_budget, as
+    accepted_budget_source says) when the negotiation ends, and admin
+    earnings are credited from it too.
+    """
+    stats = {}
+    if not user_ids:
+        return stats
+    rows = (
+        Task.objects.filter(client_id__in=user_ids)
+        .order_by()
+        .values('client_id', 'status')
+        .annotate(count=Count('id'), spend=Sum('budget', filter=Q(status='completed')))
+    )
+    for row in rows:
+        entry = stats.setdefault(row['client_id'], {"total": 0, "by_status": {}, "spend": 0})
+        entry["total"] += row['count']
+        entry["by_status"][row['status']] = row['count']
+        entry["spend"] += row['spend'] or 0
+    for entry in stats.values():
+        entry["total_spend"] = f"{entry.pop('spend'):.2f}"
+    return stats
+
+
 class AdminUserViewSet(viewsets.ViewSet):
     """
     Safe and isolated admin user endpoints.
     """
     permission_classes = [IsAuthenticated, IsAdmin]
 
-    # GET /api/admin/users/
-    def list(self, request):
-        users = UserProfile.objects.filter(role="client")
-        return Response([
-            {
-                "id": u.user.id,
-                "username": u.user.username,
-                "email": u.user.email,
-                "role": u.role,
-                "is_active": u.user.is_active,
-            }
-            for u in users
-        ])
-
-    # GET /api/admin/users/<id>/
-    def retrieve(self, request, pk=None):
-        profile = get_object_or_404(UserProfile, user__pk=pk)
-        user = profile.user
+    def _clients(self):
+        return User.objects.filter(profile__role="client").select_related("profile")
 
-        return Response({
+    def _user_data(self, user, stats, fields):
+        data = trim_fields({
             "id": user.id,
             "username": user.username,
             "email": user.email,
-            "role": profile.role,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "role": user.profile.role,
             "is_active": user.is_active,
-            "tasks": TaskSerializer(user.tasks.all(), many=True, context={'request': request}).data,
-        })
+            "date_joined": user.date_joined,
+        }, fields)
+        if stats is not None:
+            data["task_stats"] = stats.get(user.id, empty_task_stats())
+        return data
+
+    # GET /api/admin/users/  (?search=, ?fields=, ?cursor= / ?page_size= for keyset pages)
+    def list(self, request):
+        fields = parse_csv_param(request, 'fields')
+        users = self._clients()
+        search = request.query_params.get('search', '').strip()
+        if search:
+            users = users.filter(Q(username__icontains=search) | Q(email__icontains=search))
+
+        paginator = UserCursorPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        rows = page if page is not None else list(users.order_by('-date_joined', '-id'))
+
+        # Aggregates for just the rows on this page, in one GROUP BY
+        want_stats = fields is None or "task_stats" in fields
+        stats = client_task_stats([user.id for user in rows]) if want_stats else None
+        data = [self._user_data(user, stats, fields) for user in rows]
+        if page is not None:
+            return paginator.get_paginated_response(data)
+        return Response(data)
+
+    # GET /api/admin/users/<id>/  (?fields=; "tasks" is the first page of /api/admin/users/<id>/tasks/)
+    def retrieve(self, request, pk=None):
+        fields = parse_csv_param(request, 'fields')
+        user = get_object_or_404(User.objects.select_related("profile"), pk=pk, profile__isnull=False)
+        want_stats = fields is None or "task_stats" in fields
+        stats = client_task_stats([user.id]) if want_stats else None
+        data = self._user_data(user, stats, fields)
+        if fields is None or "tasks" in fields:
+            # Kept for existing callers, bounded to one page; "tasks_next" continues it
+            page = self._task_page(request, user, embedded=True)
+            data["tasks"] = page["results"]
+            data["tasks_next"] = page["next"]
+        return Response(data)
+
+    def _task_page(self, request, user, embedded=False):
+        # Embedded in retrieve, ?fields= picks user keys, so tasks keep the full shape
+        context = {'request': request} if embedded else {'request': request, **fieldset_context(request)}
+        task_filter = TaskFilter(request)
+        serializer_class = TaskSerializer if embedded else task_list_serializer(request)
+        tasks = task_filter.filter_queryset(serializer_class(context=context).optimize_queryset(
+            user.tasks.all(), always=('created_at', 'deadline')
+        ))
+        paginator = UserTaskPagination()
+        self.keyset_ordering = task_filter.ordering
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        if embedded:
+            # Continue from the tasks endpoint rather than this one
+            paginator.base_url = request.build_absolute_uri(f'/api/admin/users/{user.pk}/tasks/')
+        return paginator.get_paginated_data(serializer_class(page, many=True, context=context).data)
+
+    # GET /api/admin/users/<id>/tasks/  (keyset pages of 50 by default, ?view=summary, ?fields= / ?expand=, core.filters params)
+    @action(detail=True, methods=['get'])
+    def tasks(self, request, pk=None):
+        user = get_object_or_404(User, pk=pk)
+        return Response(self._task_page(request, user))
 
     # POST /api/admin/users/<id>/activate_new/
     @action(detail=True, methods=['post'])
@@ -139,3 +252,38 @@ class AdminUserViewSet(viewsets.ViewSet):
         user = profile.user
         user.delete()
         return Response({"detail": "User deleted"})
+
+
+# --------------------------------------------------------------------------- #
+# ADMIN EXPORTS
+# --------------------------------------------------------------------------- #
+class AdminExportView(APIView):
+    """
+    GET /api/admin/export/<tasks|budget_proposals|chat_messages>.<ndjson|csv>
+        ?since=&until=   created_at range (date or datetime)
+        ?status=         task status(es)
+    Streams rows from a DB cursor; nothing is built up in memory.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, dataset, fmt):
+        if dataset not in DATASETS or fmt not in EXPORT_FORMATS:
+            raise NotFound()
+
+        since, until = request.query_params.get('since'), request.query_params.get('until')
+        statuses = parse_csv_param(request, 'status')
+        if statuses and statuses - {value for value, _ in Task.STATUS_CHOICES}:
+            raise ValidationError({'status': 'Unknown status.'})
+
+        rows = export_rows(
+            dataset,
+            since=parse_moment(since, 'since') if since else None,
+            until=parse_moment(until, 'until') if until else None,
+            statuses=statuses,
+        )
+        content = encode_export(dataset, fmt, rows)
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_export(content)
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+        return response
@@ -6,4 +6,5 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
-        import core.signals  # noqa
\ No newline at end of file
+        import core.signals  # noqa
+        import core.checks  # noqa
\ No newline at end of file
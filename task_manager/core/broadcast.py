@@ -0,0 +1,59 @@
+# core/broadcast.py
+"""
+Task update broadcasts.
+
+Write views don't send frames themselves: they report changed tasks to the
+request's TaskBroadcast (views.atomic_write sets one up). When the view has
+succeeded, still inside its transaction, flush() serializes each task once
+(reusing the response's serialization, see core.cache) and queues one
+outbox row per task addressed to all of its groups. The frame carries the
+whole task and its Task.version, so a client keeps the highest version it
+has seen. Several updates of the same task in one request coalesce into
+one frame with the final state; the outbox drainer sends it after commit,
+to the groups concurrently.
+"""
+from .cache import serialize_task
+from .outbox import enqueue_broadcasts
+
+
+def task_event(task, data, event_type='task_updated'):
+    """The frame announcing `task`, serialized as `data`."""
+    return {"type": event_type, "task_id": task.pk, "version": task.version, "task": data}
+
+
+def task_groups(task):
+    """Everyone following `task`: its room, the admin dashboard and the client's own group."""
+    return {f"task_{task.pk}", "admin_dashboard", f"client_{task.client_id}"}
+
+
+class TaskBroadcast:
+    def __init__(self):
+        self.pending = {}  # task pk -> [task, request, event type]
+
+    def add(self, task, request=None, event_type='task_updated'):
+        entry = self.pending.get(task.pk)
+        if entry is None:
+            self.pending[task.pk] = [task, request, event_type]
+            return
+        # Latest state wins; a task created in this request stays a task_created frame
+        entry[0], entry[1] = task, request
+        if event_type == 'task_created':
+            entry[2] = event_type
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        enqueue_broadcasts(
+            (sorted(task_groups(task)), task_event(task, serialize_task(task, request), event_type))
+            for task, request, event_type in pending.values()
+        )
+
+
+def broadcast_task_update(request, task, event_type='task_updated'):
+    """Queue a frame for `task`: coalesced per request in write views, right away elsewhere."""
+    broadcast = getattr(request, 'task_broadcast', None)
+    if broadcast is None:
+        broadcast = TaskBroadcast()
+        broadcast.add(task, request, event_type)
+        broadcast.flush()
+    else:
+        broadcast.add(task, request, event_type)
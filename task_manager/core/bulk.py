@@ -0,0 +1,189 @@
+# core/bulk.py
+"""
+Bulk admin actions over many tasks: POST /api/admin/tasks/bulk/
+
+    {"action": "accept" | "reject" | "propose_budget" | "mark_complete",
+     "ids": [1, 2, 3], "reason": "...", "amount": "120.00"}
+
+Each action mirrors its single-task view (AdminAcceptTask, AdminRejectTask,
+AdminProposeBudget, AdminMarkComplete) but runs as a few set-based
+statements in one transaction: lock and classify the rows, one UPDATE,
+and outbox rows for one bulk notification job and one coalesced dashboard
+broadcast. Ineligible ids are reported back instead of failing the batch.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import list_versions
+from .cache import serialize_task
+from .models import BudgetProposal, Task, UserProfile
+from .outbox import enqueue_broadcasts, enqueue_task
+from .broadcast import task_event
+from .tasks import create_task_notifications, notify_tasks_status_update
+
+MAX_BULK_TASKS = 500
+
+# Statuses each action may start from (None = any)
+ELIGIBLE_STATUSES = {
+    'accept': ('submitted', 'rejected'),
+    'reject': ('submitted', 'budget_negotiation', 'in_progress', 'awaiting_review', 'revision_requested'),
+    'propose_budget': ('submitted', 'budget_negotiation'),
+    'mark_complete': None,
+}
+
+
+class BulkActionError(ValueError):
+    pass
+
+
+def parse_bulk_request(data):
+    action = data.get('action')
+    if action not in ELIGIBLE_STATUSES:
+        raise BulkActionError(f"action must be one of: {', '.join(ELIGIBLE_STATUSES)}")
+
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise BulkActionError("ids must be a non-empty list")
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in ids))
+    except (TypeError, ValueError):
+        raise BulkActionError("ids must be integers")
+    if len(ids) > MAX_BULK_TASKS:
+        raise BulkActionError(f"At most {MAX_BULK_TASKS} tasks per request")
+
+    options = {}
+    if action == 'reject':
+        options['reason'] = (data.get('reason') or '').strip()
+        if not options['reason']:
+            raise BulkActionError("Reason is required")
+    elif action == 'propose_budget':
+        try:
+            options['amount'] = Decimal(str(data.get('amount')))
+        except (InvalidOperation, ValueError):
+            raise BulkActionError("Amount is required")
+        if not options['amount'].is_finite() or options['amount'] <= 0:
+            raise BulkActionError("Amount is required")
+        options['reason'] = data.get('reason', '')
+    return action, ids, options
+
+
+def _classify(action, ids, user):
+    """Lock the requested rows and split them into (eligible ids, skipped)."""
+    rows = {
+        pk: (task_status, admin_id)
+        for pk, task_status, admin_id in Task.objects.select_for_update()
+        .filter(pk__in=ids).values_list('pk', 'status', 'assigned_admin_id')
+    }
+    allowed = ELIGIBLE_STATUSES[action]
+    eligible, skipped = [], []
+    for pk in ids:
+        if pk not in rows:
+            skipped.append({'id': pk, 'error': 'not_found'})
+            continue
+        task_status, admin_id = rows[pk]
+        if action == 'mark_complete' and admin_id != user.id:
+            skipped.append({'id': pk, 'error': 'not_assigned'})
+        elif action == 'mark_complete' and task_status == 'completed':
+            skipped.append({'id': pk, 'error': 'invalid_status', 'status': task_status})
+        elif allowed is not None and task_status not in allowed:
+            skipped.append({'id': pk, 'error': 'invalid_status', 'status': task_status})
+        else:
+            eligible.append(pk)
+    return eligible, skipped
+
+
+def _literal(text):
+    # Notification messages are str.format()ed with the task title later
+    return str(text).replace('{', '{{').replace('}', '}}')
+
+
+def _apply(action, eligible, user, options, now):
+    """Run the UPDATEs for `action`; returns the (celery task, args) notifying the clients."""
+    tasks = Task.objects.filter(pk__in=eligible)
+    # Bulk UPDATE skips save(): bump version/updated_at by hand for caches and delta sync
+    bump = {'version': F('version') + 1, 'updated_at': now}
+
+    if action == 'accept':
+        tasks.update(status='in_progress', assigned_admin=user, accepted_at=now, progress=5, **bump)
+        who = _literal(user.get_full_name() or user.username)
+        return notify_tasks_status_update, (
+            eligible, f"Your task '{{title}}' has been accepted by {who} and work has begun."
+        )
+
+    elif action == 'reject':
+        reason = options['reason']
+        tasks.update(status='rejected', reject_reason=reason, rejected_at=now, assigned_admin=None, **bump)
+        return notify_tasks_status_update, (
+            eligible, f"Your task '{{title}}' has been rejected. Reason: {_literal(reason)}"
+        )
+
+    elif action == 'propose_budget':
+        amount, reason = options['amount'], options['reason']
+        BudgetProposal.objects.bulk_create([
+            BudgetProposal(task_id=pk, amount=amount, description=reason, proposed_by=user)
+            for pk in eligible
+        ])
+        tasks.update(
+            admin_counter_budget=amount, negotiation_status='pending_student_response',
+            negotiation_reason=reason, status='budget_negotiation', assigned_admin=user, **bump
+        )
+        return create_task_notifications, (
+            eligible, "Budget Counter-Offer Received",
+            f"Expert has proposed a counter-offer of ${amount} for your task '{{title}}'",
+            'budget_proposed',
+        )
+
+    else:  # mark_complete
+        earned = tasks.aggregate(total=Coalesce(Sum('budget'), Decimal('0')))['total']
+        tasks.update(status='completed', progress=100, completed_at=now, **bump)
+        UserProfile.objects.filter(user=user).update(
+            completed_tasks=F('completed_tasks') + len(eligible),
+            earnings=F('earnings') + earned,
+        )
+        return notify_tasks_status_update, (
+            eligible, "Your task '{title}' has been completed successfully."
+        )
+
+
+def broadcast_tasks(tasks, task_data):
+    """
+    One admin_dashboard message for the whole batch (the consumer fans it
+    out as one frame per task) plus one per task for its room and client,
+    queued in the outbox.
+    """
+    if not task_data:
+        return
+    events = [task_event(task, data) for task, data in zip(tasks, task_data)]
+    enqueue_broadcasts(
+        [("admin_dashboard", {"type": "tasks_updated", "events": events})]
+        + [
+            ([f"task_{task.pk}", f"client_{task.client_id}"], event)
+            for task, event in zip(tasks, events)
+        ]
+    )
+
+
+def run_bulk_action(request, action, ids, options):
+    user = request.user
+    now = timezone.now()
+
+    with transaction.atomic():
+        eligible, skipped = _classify(action, ids, user)
+        if not eligible:
+            return {'action': action, 'updated': [], 'skipped': skipped, 'tasks': []}
+
+        notify, args = _apply(action, eligible, user, options, now)
+        enqueue_task(notify, *args)
+
+        from .serializers import TaskSerializer
+        serializer = TaskSerializer(context={'request': request, 'fields': None, 'expand': set()})
+        tasks = list(serializer.optimize_queryset(Task.objects.filter(pk__in=eligible), always=('version',)))
+        task_data = [serialize_task(task, request) for task in tasks]
+        broadcast_tasks(tasks, task_data)
+        list_versions.bump_tasks(*{task.client_id for task in tasks})
+
+    return {'action': action, 'updated': eligible, 'skipped': skipped, 'tasks': task_data}
@@ -0,0 +1,138 @@
+# core/cache.py
+"""
+Cache of serialized task representations.
+
+Entries are keyed by (task id, Task.version, serializer, viewer role, host,
+read positions when annotated), so a bump of Task.version (on save, or on
+file / revision / chat writes — see core.signals) is the invalidation:
+stale entries are simply never asked for again and fall out of the LRU. Fields that change with the clock alone
+(serializers.CLOCK_FIELDS) are recomputed on every call instead.
+
+Tier 1 is a per-process LRU. Tier 2 is an optional Django cache backend
+(settings.TASK_CACHE_ALIAS) so processes can share entries.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+
+class LRUCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LRUCache(getattr(settings, 'TASK_CACHE_SIZE', 512))
+
+# Read-state annotations (Task.objects.with_read_positions / with_unread_counts)
+READ_ANNOTATIONS = ('client_read_id', 'staff_read_id', 'unread_count')
+
+
+def _shared_cache():
+    alias = getattr(settings, 'TASK_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _plain(data):
+    """ReturnDict/ReturnList hold a serializer reference; store plain containers."""
+    if isinstance(data, (dict, ReturnDict)):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, (list, ReturnList)):
+        return [_plain(value) for value in data]
+    return data
+
+
+def _viewer_role(request):
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'anon'
+    profile = getattr(user, 'profile', None)
+    return getattr(profile, 'role', 'client') if profile else 'client'
+
+
+def task_cache_key(task, serializer_class, request=None):
+    # unread_messages depends on the viewer's role, file URLs on the host, and
+    # both on read positions, which chat reads move without a version bump
+    host = f"{request.scheme}://{request.get_host()}" if request is not None else '-'
+    reads = ','.join(str(getattr(task, name, '')) for name in READ_ANNOTATIONS)
+    return f"task:{task.pk}:v{task.version}:{serializer_class.__name__}:{_viewer_role(request)}:{host}:{reads}"
+
+
+def _with_clock_fields(data, task):
+    from .serializers import CLOCK_FIELDS
+
+    present = [name for name in CLOCK_FIELDS if name in data]
+    if not present:
+        return data
+    data = dict(data)
+    for name in present:
+        data[name] = CLOCK_FIELDS[name](task)
+    return data
+
+
+def serialize_task(task, request=None, serializer_class=None):
+    """
+    Serialized `task` for `request`, built at most once per task version.
+    Nested values are shared — treat the result as read-only.
+    """
+    if serializer_class is None:
+        from .serializers import TaskSerializer
+        serializer_class = TaskSerializer
+
+    key = task_cache_key(task, serializer_class, request)
+    # Write views (views.atomic_write) memoize per request: their caching below
+    # waits for the commit, but the response and the broadcast share one build
+    memo = getattr(request, 'serialized_tasks', None)
+    if memo is not None and key in memo:
+        return _with_clock_fields(memo[key], task)
+    data = _local.get(key)
+    if data is not None:
+        return _with_clock_fields(data, task)
+
+    shared = _shared_cache()
+    if shared is not None:
+        data = shared.get(key)
+        if data is not None:
+            _local.set(key, data)
+            return _with_clock_fields(data, task)
+
+    data = _plain(serializer_class(task, context={'request': request}).data)
+
+    def store():
+        _local.set(key, data)
+        if shared is not None:
+            shared.set(key, data, getattr(settings, 'TASK_CACHE_TIMEOUT', 300))
+
+    # Inside a write transaction the version bump may still roll back (and the
+    # version be reused by another write), so only cache what got committed
+    transaction.on_commit(store)
+    if memo is not None:
+        memo[key] = data
+    return data
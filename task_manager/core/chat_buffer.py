@@ -0,0 +1,156 @@
+# core/chat_buffer.py
+"""
+Write-behind persistence for chat messages sent over the task WebSocket.
+
+TaskConsumer broadcasts a message as soon as it arrives, identified by the
+sender's `client_id` (generated server-side when the client sent none),
+and hands it to the process-wide ChatWriteBuffer. The buffer writes
+everything it holds with one bulk_create every CHAT_BUFFER_INTERVAL
+seconds, or as soon as CHAT_BUFFER_MAX_SIZE messages are waiting, then
+tells each room which database ids its messages got:
+
+    {"type": "chat_ack", "messages": [{"client_id": "...", "id": 41, "created_at": "..."}]}
+
+Until its chat_ack a message exists only in this process's memory (the
+chat_message broadcast carries "id": null and the client_id). A failed
+flush keeps the messages and retries, and a closing socket flushes before
+it goes, so a graceful shutdown drains the buffer. A process that crashes
+loses whatever it had not flushed: a client sending over the socket must
+keep each message until its chat_ack and resend it with the same
+client_id after a reconnect. The insert is idempotent on (sender,
+client_id), so resends never create duplicates. The dashboards post chat
+through the REST endpoint, which stores a message before answering, and
+only have to handle the null ids and chat_ack frames of messages others
+sent over the socket.
+"""
+import asyncio
+import logging
+import uuid
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import list_versions
+from .frames import packed
+from .models import ChatMessage, Task
+
+logger = logging.getLogger(__name__)
+
+CHAT_BUFFER_INTERVAL = 0.25  # seconds
+CHAT_BUFFER_MAX_SIZE = 100
+# Beyond this many unsaved messages (database down) new ones are refused
+CHAT_BUFFER_HARD_LIMIT = 5000
+
+
+def new_client_id():
+    return uuid.uuid4().hex
+
+
+def persist_messages(messages):
+    """
+    Insert `messages` (unsaved ChatMessages with client_id set) in one
+    statement and do what ChatMessage's post_save signals would have done.
+    Returns the saved messages; those of since-deleted tasks are dropped.
+    """
+    from .digests import schedule_digest
+
+    with transaction.atomic():
+        tasks = Task.objects.only('id', 'client_id', 'assigned_admin_id').in_bulk({m.task_id for m in messages})
+        rows = [m for m in messages if m.task_id in tasks]
+        if not rows:
+            return []
+        # A resent client_id resolves to the row already stored
+        ChatMessage.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['sender', 'client_id'], update_fields=['client_id'],
+        )
+        # One version bump per task instead of one per message (see signals.bump_task_version)
+        Task.objects.filter(pk__in={m.task_id for m in rows}).update(
+            version=F('version') + 1, updated_at=timezone.now()
+        )
+        list_versions.bump_tasks(*{tasks[m.task_id].client_id for m in rows})
+        # Digests coalesce anyway: one schedule per (task, sender) is enough
+        seen = set()
+        for m in rows:
+            if (m.task_id, m.sender_id) not in seen:
+                seen.add((m.task_id, m.sender_id))
+                m.task = tasks[m.task_id]
+                schedule_digest(m)
+    return rows
+
+
+class BufferFull(Exception):
+    pass
+
+
+class ChatWriteBuffer:
+    def __init__(self):
+        self.pending = []
+        self._lock = asyncio.Lock()
+        self._timer = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'CHAT_BUFFER_INTERVAL', CHAT_BUFFER_INTERVAL)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'CHAT_BUFFER_MAX_SIZE', CHAT_BUFFER_MAX_SIZE)
+
+    async def add(self, message):
+        if len(self.pending) >= CHAT_BUFFER_HARD_LIMIT:
+            raise BufferFull()
+        self.pending.append(message)
+        if len(self.pending) >= self.max_size:
+            # Don't hold up the caller's broadcast on the insert
+            asyncio.ensure_future(self.flush())
+        else:
+            self._schedule(self.interval)
+
+    def _schedule(self, delay):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._fire)
+
+    def _fire(self):
+        self._timer = None
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self.pending = self.pending, []
+            if not batch:
+                return
+            try:
+                saved = await database_sync_to_async(persist_messages)(batch)
+            except Exception:
+                logger.exception("Chat buffer flush failed, will retry")
+                # Keep arrival order: the failed batch goes back in front
+                self.pending[:0] = batch
+                self._schedule(max(self.interval, 1.0))
+                return
+        await self._ack(saved)
+
+    async def _ack(self, saved):
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        by_task = {}
+        for m in saved:
+            by_task.setdefault(m.task_id, []).append({
+                'client_id': m.client_id,
+                'id': m.id,
+                'created_at': m.created_at.isoformat(),
+            })
+        await asyncio.gather(*(
+            channel_layer.group_send(f"task_{task_id}", packed({'type': 'chat_ack', 'messages': acks}))
+            for task_id, acks in by_task.items()
+        ), return_exceptions=True)
+
+
+chat_buffer = ChatWriteBuffer()
@@ -0,0 +1,81 @@
+# core/chat_read.py
+"""
+Chat read cursors.
+
+Reading a task's chat moves the reader's ChatReadCursor up to the newest
+message read instead of flagging messages one by one, so marking a thread
+of any length read is one upsert. Unread counts are the messages past a
+cursor (Task.objects.with_unread_counts), and a message shows as read once
+the other side's cursor has passed it.
+
+Reads leave Task.version alone: views that show read state validate on the
+read positions themselves (views.TaskDetail), and task lists are bumped
+through core.list_versions.
+
+A task's admins share one read position, the furthest any of them has
+read, as they shared the per-message flag these cursors replace.
+"""
+from django.db import connection
+from django.utils import timezone
+
+from . import list_versions
+from .models import ChatMessage, ChatReadCursor, Task
+
+
+def _upsert_sql(bounded):
+    # bulk_create(update_conflicts=True) can't keep the greater position, so
+    # the guard is the WHERE of the DO UPDATE (PostgreSQL and SQLite alike)
+    qn = connection.ops.quote_name
+    cursors, messages = qn(ChatReadCursor._meta.db_table), qn(ChatMessage._meta.db_table)
+    task, user = (qn(ChatReadCursor._meta.get_field(name).column) for name in ('task', 'user'))
+    position, updated_at = qn('last_read_message_id'), qn('updated_at')
+    message_task = qn(ChatMessage._meta.get_field('task').column)
+    up_to = f" AND {qn('id')} <= %s" if bounded else ''
+    return (
+        f"INSERT INTO {cursors} ({task}, {user}, {position}, {updated_at}) "
+        f"SELECT %s, %s, newest.m, %s FROM ("
+        f"SELECT MAX({qn('id')}) AS m FROM {messages} WHERE {message_task} = %s{up_to}"
+        f") newest WHERE newest.m IS NOT NULL "
+        f"ON CONFLICT ({task}, {user}) DO UPDATE SET "
+        f"{position} = excluded.{position}, {updated_at} = excluded.{updated_at} "
+        f"WHERE {cursors}.{position} < excluded.{position} "
+        f"RETURNING {position}"
+    )
+
+
+def mark_read_up_to(user, task_id, up_to=None, client_id=None):
+    """
+    Move `user`'s cursor on the task to message `up_to` (default: the
+    newest), in one statement. Cursors only move forward and stop at the
+    newest message up to `up_to`. Returns the new position, or None when
+    the cursor didn't move. `client_id` (the task's client) saves a lookup.
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = [task_id, user.pk, now, task_id]
+    if up_to is not None:
+        params.append(int(up_to))
+    with connection.cursor() as cursor:
+        cursor.execute(_upsert_sql(up_to is not None), params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    # Both sides' lists show the read state (unread counts, is_read)
+    if client_id is None:
+        client_id = Task.objects.filter(pk=task_id).values_list('client_id', flat=True).first()
+    list_versions.bump_tasks(client_id)
+    return row[0]
+
+
+def read_positions(task_id):
+    """(client id, client read position, staff read position) of a task, or None."""
+    return (
+        Task.objects.filter(pk=task_id).with_read_positions()
+        .values_list('client_id', 'client_read_id', 'staff_read_id').first()
+    )
+
+
+def read_by_peer(message, positions):
+    """Whether the other side of the conversation has read `message`."""
+    client_id, client_read, staff_read = positions
+    return message.id <= (staff_read if message.sender_id == client_id else client_read)
@@ -0,0 +1,27 @@
+# core/checks.py
+"""System checks for caches that every process (web, Celery, outbox drainer) must share."""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Setting naming a cache alias -> what goes wrong when that cache is per-process
+SHARED_CACHE_SETTINGS = {
+    'NOTIFICATION_COUNT_CACHE': 'unread notification counts drift apart between processes',
+}
+PER_PROCESS_BACKENDS = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    warnings = []
+    for setting, consequence in SHARED_CACHE_SETTINGS.items():
+        alias = getattr(settings, setting, None)
+        if not alias:
+            continue
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PER_PROCESS_BACKENDS:
+            warnings.append(Warning(
+                f"{setting} uses the per-process cache '{alias}': {consequence}.",
+                hint="Point it at a shared backend such as Redis, or leave it unset.",
+                id='core.W001',
+            ))
+    return warnings
@@ -0,0 +1,67 @@
+# core/conditional.py
+"""
+ETag / If-None-Match for polled read endpoints.
+
+Views supply a cheap validator (typically one aggregate or one indexed
+lookup) through get_etag_validator(); when it matches the client's
+If-None-Match the view answers 304 without touching the serializer.
+"""
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(request, *parts):
+    """Weak ETag over the validator parts, the full query string and the viewer."""
+    user = getattr(request, 'user', None)
+    material = '|'.join([
+        request.get_full_path(),
+        str(getattr(user, 'pk', None)),
+        *(str(part) for part in parts),
+    ])
+    return 'W/' + quote_etag(hashlib.md5(material.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Weak comparison, as If-None-Match requires
+    bare = etag.removeprefix('W/')
+    return any(candidate == '*' or candidate.removeprefix('W/') == bare
+               for candidate in parse_etags(header))
+
+
+def not_modified(etag):
+    return set_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def set_etag(response, etag):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Wraps GET with ETag handling. Subclasses implement get_etag_validator()
+    returning a tuple of values that changes whenever the response would,
+    or None to skip validation for this request.
+    """
+
+    def get_etag_validator(self, request, *args, **kwargs):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        validator = self.get_etag_validator(request, *args, **kwargs)
+        if validator is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = make_etag(request, *validator)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return set_etag(super().get(request, *args, **kwargs), etag)
@@ -1,13 +1,45 @@
+import logging
 import os
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 import django
 django.setup()
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.utils import timezone
 from .models import Task, ChatMessage
+from .chat_buffer import BufferFull, chat_buffer, new_client_id
+from .chat_read import mark_read_up_to
+from .presence import TypingThrottle
+from .frames import decode_frame, encode_frame, negotiate, packed
 
-class TaskConsumer(AsyncWebsocketConsumer):
+logger = logging.getLogger(__name__)
+
+
+class FramedConsumer(AsyncWebsocketConsumer):
+    """A consumer speaking the encoding negotiated at connect (core.frames)."""
+    encoding = 'json'
+
+    async def accept_framed(self):
+        self.encoding, subprotocol = negotiate(self.scope.get('subprotocols'))
+        await self.accept(subprotocol)
+
+    async def send_encoded(self, encoded):
+        data = encoded[self.encoding]
+        if isinstance(data, bytes):
+            await self.send(bytes_data=data)
+        else:
+            await self.send(text_data=data)
+
+    async def send_frame(self, frame):
+        await self.send_encoded(encode_frame(frame))
+
+    async def send_frames(self, event):
+        # Group messages come encoded by their sender
+        for encoded in event['frames']:
+            await self.send_encoded(encoded)
+
+
+class TaskConsumer(FramedConsumer):
     async def connect(self):
         self.task_id = self.scope['url_route']['kwargs']['task_id']
         self.room_group_name = f"task_{self.task_id}"
@@ -20,85 +52,112 @@ class TaskConsumer(AsyncWebsocketConsumer):
         if not has_access:
             await self.close()
             return
+        self.sender_role = await self.get_sender_role(self.scope["user"])
+        self.typing = TypingThrottle(self.publish_typing)
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-        await self.accept()
+        await self.accept_framed()
 
     async def disconnect(self, close_code):
+        typing = getattr(self, 'typing', None)
+        if typing is not None:
+            # Others shouldn't see this user typing forever
+            await typing.close()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        # Don't leave this socket's messages waiting on the timer
+        await chat_buffer.flush()
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         try:
-            data = json.loads(text_data)
+            data = decode_frame(text_data, bytes_data)
             message_type = data.get('type')
 
             if message_type == 'chat_message':
                 content = data.get('message', '').strip()
                 file_data = data.get('file')  # { url: "...", name: "file.pdf" }
-
-                # Save message + file info
-                message_obj = await self.create_chat_message(
-                    task_id=self.task_id,
-                    user=self.scope["user"],
-                    content=content,
-                    file_url=file_data.get('url') if file_data else None,
-                    file_name=file_data.get('name') if file_data else None
+                # Resends after a reconnect carry the same client_id and are stored once
+                client_id = str(data.get('client_id') or new_client_id())[:64]
+
+                # Saved by the write-behind buffer; chat_ack frames carry the ids
+                message_obj = ChatMessage(
+                    task_id=int(self.task_id),
+                    sender=self.scope["user"],
+                    message=content or "",
+                    file_name=(file_data.get('name') if file_data else None) or "",
+                    file_url=(file_data.get('url') if file_data else None) or "",
+                    client_id=client_id,
                 )
+                try:
+                    await chat_buffer.add(message_obj)
+                except BufferFull:
+                    await self.send_frame({
+                        'type': 'chat_error', 'client_id': client_id, 'error': 'Try again shortly'
+                    })
+                    return
 
                 # BROADCAST TO EVERYONE — THIS IS THE KEY
                 await self.channel_layer.group_send(
                     self.room_group_name,
-                    {
+                    packed({
                         'type': 'chat_message',
                         'message': {
-                            'id': message_obj.id,
+                            'id': None,
+                            'client_id': client_id,
                             'sender': self.scope["user"].username,
-                            'sender_role': self.scope["user"].profile.role if hasattr(self.scope["user"], 'profile') else 'client',
+                            'sender_role': self.sender_role,
                             'message': content,
                             'file_url': file_data.get('url') if file_data else None,
                             'file_name': file_data.get('name') if file_data else None,
-                            'created_at': message_obj.created_at.isoformat(),
+                            'created_at': timezone.now().isoformat(),
                             'is_read': False
                         }
-                    }
+                    })
                 )
 
-            elif message_type == 'typing':
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'user_typing',
-                        'user_id': self.scope["user"].id,
-                        'username': self.scope["user"].username,
-                        'is_typing': data['is_typing']
-                    }
+            elif message_type == 'mark_read':
+                # Moves the read cursor; also cancels the pending email digest for these messages
+                position = await database_sync_to_async(mark_read_up_to)(
+                    self.scope["user"], int(self.task_id), data.get('up_to'), client_id=self.client_id
                 )
+                if position:
+                    await self.channel_layer.group_send(
+                        self.room_group_name,
+                        packed({
+                            'type': 'messages_read',
+                            'user_id': self.scope["user"].id,
+                            'up_to': position,
+                        })
+                    )
 
-        except Exception as e:
-            print("WebSocket receive error:", e)
+            elif message_type == 'typing':
+                # Throttled, deduplicated and expired in core.presence
+                self.typing.update(data.get('is_typing'))
+
+        except Exception:
+            logger.exception("WebSocket receive error")
+
+    async def publish_typing(self, is_typing):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            packed({
+                'type': 'user_typing',
+                'user_id': self.scope["user"].id,
+                'username': self.scope["user"].username,
+                'is_typing': is_typing,
+                'expires_in': self.typing.timeout if is_typing else None,
+            })
+        )
 
     # ──────────────────────────────────────────────────────────────
     # Event handlers
     # ──────────────────────────────────────────────────────────────
-    async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'message': event['message']
-        }))
-
-    async def user_typing(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'user_typing',
-            'user_id': event['user_id'],
-            'username': event['username'],
-            'is_typing': event['is_typing']
-        }))
-
-    async def task_updated(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'task_updated',
-            'task': event['task']
-        }))
+    # Every group message arrives pre-encoded (core.frames)
+    chat_message = FramedConsumer.send_frames
+    user_typing = FramedConsumer.send_frames
+    chat_ack = FramedConsumer.send_frames
+    messages_read = FramedConsumer.send_frames
+    task_updated = FramedConsumer.send_frames
+    task_created = FramedConsumer.send_frames
 
     # ──────────────────────────────────────────────────────────────
     # Database helpers
@@ -107,6 +166,7 @@ class TaskConsumer(AsyncWebsocketConsumer):
     def verify_task_access(self, task_id, user):
         try:
             task = Task.objects.get(id=task_id)
+            self.client_id = task.client_id
             return (user == task.client or 
                     user == task.assigned_admin or 
                     (hasattr(user, 'profile') and user.profile.role == 'admin'))
@@ -114,17 +174,10 @@ class TaskConsumer(AsyncWebsocketConsumer):
             return False
 
     @database_sync_to_async
-    def create_chat_message(self, task_id, user, content, file_url=None, file_name=None):
-        task = Task.objects.get(id=task_id)
-        return ChatMessage.objects.create(
-            task=task,
-            sender=user,
-            message=content or "",
-            file_name=file_name or "",
-            file_url=file_url or ""
-        )
+    def get_sender_role(self, user):
+        return user.profile.role if hasattr(user, 'profile') else 'client'
 
-class AdminDashboardConsumer(AsyncWebsocketConsumer):
+class AdminDashboardConsumer(FramedConsumer):
     async def connect(self):
         user = self.scope["user"]
         
@@ -140,7 +193,7 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
         else:
             await self.channel_layer.group_add(f"client_{user.id}", self.channel_name)
         
-        await self.accept()
+        await self.accept_framed()
 
     async def disconnect(self, close_code):
         user = self.scope["user"]
@@ -150,19 +203,12 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
             else:
                 await self.channel_layer.group_discard(f"client_{user.id}", self.channel_name)
 
-    # Keep your existing event handlers
-    async def task_updated(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'task_updated',
-            'task': event['task']
-        }))
-
-    async def task_created(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'task_created',
-            'task': event['task']
-        }))
+    # Task events (core.broadcast), encoded by the outbox drainer. Bulk actions
+    # publish one tasks_updated group message holding one frame per task.
+    task_updated = FramedConsumer.send_frames
+    task_created = FramedConsumer.send_frames
+    tasks_updated = FramedConsumer.send_frames
 
     @database_sync_to_async
     def is_admin(self, user):
-        return hasattr(user, 'profile') and user.profile.role == 'admin'
\ No newline at end of file
+        return hasattr(user, 'profile') and user.profile.role == 'admin'
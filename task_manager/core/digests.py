@@ -0,0 +1,123 @@
+# core/digests.py
+"""
+Chat email digests.
+
+A new chat message doesn't email anyone by itself: it arms the (task,
+recipient) ChatDigest to go out CHAT_DIGEST_WINDOW seconds later, and
+further messages inside the window only join it. When the digest is due,
+send_due_digests() emails one summary of the recipient's messages that are
+still unread (past the recipient side's read cursor, core.chat_read) and
+newer than the previous digest. If they were all read in the meantime
+nothing is sent.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ChatDigest, ChatMessage, Task
+
+CHAT_DIGEST_WINDOW = 300  # seconds
+CHAT_DIGEST_BATCH_SIZE = 200
+# Messages quoted in one email; the rest are counted
+CHAT_DIGEST_MAX_QUOTED = 10
+
+
+def digest_window():
+    return timedelta(seconds=getattr(settings, 'CHAT_DIGEST_WINDOW', CHAT_DIGEST_WINDOW))
+
+
+def digest_recipient_id(client_id, assigned_admin_id, sender_id):
+    """The other side of the conversation (nobody while an unassigned task's client writes)."""
+    return assigned_admin_id if sender_id == client_id else client_id
+
+
+def schedule_digest(message):
+    """Arm the digest for the recipient of `message` unless one is already pending."""
+    if ChatMessage.task.is_cached(message):
+        client_id, admin_id = message.task.client_id, message.task.assigned_admin_id
+    else:
+        row = Task.objects.filter(pk=message.task_id).values_list('client_id', 'assigned_admin_id').first()
+        if row is None:
+            return
+        client_id, admin_id = row
+    recipient_id = digest_recipient_id(client_id, admin_id, message.sender_id)
+    if recipient_id is None:
+        return
+
+    due_at = timezone.now() + digest_window()
+    pending = ChatDigest.objects.filter(task_id=message.task_id, recipient_id=recipient_id)
+    # A pending digest keeps its due time: later messages join it
+    if pending.filter(due_at__isnull=True).update(due_at=due_at) or pending.exists():
+        return
+    try:
+        with transaction.atomic():
+            ChatDigest.objects.create(task_id=message.task_id, recipient_id=recipient_id, due_at=due_at)
+    except IntegrityError:
+        # Created concurrently by another message; that one armed it
+        pass
+
+
+def send_due_digests(now=None, batch_size=CHAT_DIGEST_BATCH_SIZE):
+    """Email every digest that has come due; returns the number of emails queued."""
+    from .email_service import build_chat_digest_email
+    from .outbox import enqueue_emails
+
+    now = now or timezone.now()
+    queued = 0
+    while True:
+        with transaction.atomic():
+            digests = list(
+                ChatDigest.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(due_at__lte=now)
+                .select_related('task', 'recipient__profile')
+                .order_by('due_at', 'id')[:batch_size]
+            )
+            if not digests:
+                return queued
+
+            positions = {
+                pk: (client_read, staff_read) for pk, client_read, staff_read in
+                Task.objects.filter(pk__in={d.task_id for d in digests}).with_read_positions()
+                .values_list('pk', 'client_read_id', 'staff_read_id')
+            }
+            after = {}
+            for digest in digests:
+                client_read, staff_read = positions.get(digest.task_id, (0, 0))
+                read = client_read if digest.recipient_id == digest.task.client_id else staff_read
+                # Newer than the previous digest and than what the recipient's side has read
+                after[digest.pk] = max(read, digest.last_message_id)
+
+            # Everything these digests may quote in one query (ranges on the (task, id) index)
+            since = {}
+            for digest in digests:
+                since[digest.task_id] = min(since.get(digest.task_id, after[digest.pk]), after[digest.pk])
+            pending = Q()
+            for task_id, message_id in since.items():
+                pending |= Q(task_id=task_id, id__gt=message_id)
+            unread = defaultdict(list)
+            for m in ChatMessage.objects.filter(pending).select_related('sender').order_by('id'):
+                unread[m.task_id].append(m)
+
+            emails = []
+            for digest in digests:
+                messages = [
+                    m for m in unread[digest.task_id]
+                    if m.sender_id != digest.recipient_id and m.id > after[digest.pk]
+                ]
+                digest.due_at = None
+                if messages and digest.recipient.email:
+                    emails.append(build_chat_digest_email(
+                        digest.task, digest.recipient, messages[-CHAT_DIGEST_MAX_QUOTED:], len(messages)
+                    ))
+                    digest.last_message_id = messages[-1].id
+                    digest.sent_at = now
+            enqueue_emails(emails)
+            ChatDigest.objects.bulk_update(digests, ['due_at', 'last_message_id', 'sent_at'])
+
+        queued += len(emails)
+        if len(digests) < batch_size:
+            return queued
@@ -1,18 +1,23 @@
 # core/email_service.py
+# build_* render a message; send_* queue it in the outbox, and the drainer
+# delivers queued emails in batches over one connection (core/mailer.py).
 
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.conf import settings
+from django.utils import timezone
 
+from .mailer import build_email
+from .outbox import enqueue_emails
 
-def send_new_task_notification(task):
-    """Send email notification to ALL admins + extra Gmail addresses when a new task is created"""
-    from .models import UserProfile
+
+def build_new_task_email(task):
+    """Email to ALL admins + extra Gmail addresses about a new task (None if nobody to tell)"""
+    from django.contrib.auth.models import User
     
-    # 1. Get all active admin users from database
-    admin_profiles = UserProfile.objects.filter(role='admin', user__is_active=True)
-    admin_emails = [profile.user.email for profile in admin_profiles if profile.user.email]
+    # 1. Get all active admin users from database (one query, emails only)
+    admin_emails = list(
+        User.objects.filter(profile__role='admin', is_active=True)
+        .exclude(email='').values_list('email', flat=True)
+    )
 
     # 2. Your personal/extra Gmail addresses (edit anytime)
     EXTRA_ADMIN_EMAILS = [
@@ -26,7 +31,7 @@ def send_new_task_notification(task):
     recipient_emails = list(set(admin_emails + EXTRA_ADMIN_EMAILS))
 
     if not recipient_emails:
-        return  # Nothing to send
+        return None  # Nothing to send
 
     subject = f"NEW TASK • {task.title} • {task.task_id or f'TSK{task.id:04d}'}"
 
@@ -42,27 +47,20 @@ def send_new_task_notification(task):
         'task_url': f"{settings.FRONTEND_URL}/admin/dashboard",             # ← THIS LINE IS HERE
     }
     
-    html_message = render_to_string('emails/new_task_notification.html', context)
-    plain_message = strip_tags(html_message)
-
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=plain_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=recipient_emails,
-    )
-    email.attach_alternative(html_message, "text/html")
-    
-    try:
-        email.send()
-        print(f"New task email sent successfully to: {recipient_emails}")
-    except Exception as e:
-        print(f"Failed to send new task email: {e}")
+    return build_email(subject, 'emails/new_task_notification.html', context,
+                       to=recipient_emails, from_email=settings.DEFAULT_FROM_EMAIL)
+
+
+def send_new_task_notification(task):
+    """Queue the new-task email to the admins"""
+    email = build_new_task_email(task)
+    if email is not None:
+        enqueue_emails([email])
 
 # === ADD THESE 3 FUNCTIONS TO core/email_service.py ===
 
-def send_task_status_update(task, student, update_message):
-    """Send email to student when task status is updated"""
+def build_task_status_email(task, student, update_message):
+    """Email to the student about a task status update"""
     subject = f"Task Update: {task.title}"
     
     context = {
@@ -74,21 +72,17 @@ def send_task_status_update(task, student, update_message):
         'task_url': f"{settings.FRONTEND_URL}/client/dashboard/tasks/{task.id}"
     }
     
-    html_message = render_to_string('emails/task_status_update.html', context)
-    plain_message = strip_tags(html_message)
-    
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=plain_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[student.email]
-    )
-    email.attach_alternative(html_message, "text/html")
-    email.send()
+    return build_email(subject, 'emails/task_status_update.html', context,
+                       to=[student.email], from_email=settings.DEFAULT_FROM_EMAIL)
 
 
-def send_new_message_notification(task, message, recipient):
-    """Send email notification for new chat messages"""
+def send_task_status_update(task, student, update_message):
+    """Queue the status update email to the student"""
+    enqueue_emails([build_task_status_email(task, student, update_message)])
+
+
+def build_new_message_email(task, message, recipient):
+    """Email to `recipient` about a new chat message"""
     subject = f"New Message - Task: {task.title}"
     
     context = {
@@ -98,14 +92,33 @@ def send_new_message_notification(task, message, recipient):
         'task_url': f"{settings.FRONTEND_URL}/client/dashboard/tasks/{task.id}"
     }
     
-    html_message = render_to_string('emails/new_message_notification.html', context)
-    plain_message = strip_tags(html_message)
-    
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=plain_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[recipient.email]
-    )
-    email.attach_alternative(html_message, "text/html")
-    email.send()
\ No newline at end of file
+    return build_email(subject, 'emails/new_message_notification.html', context,
+                       to=[recipient.email], from_email=settings.DEFAULT_FROM_EMAIL)
+
+
+def send_new_message_notification(task, message, recipient):
+    """Queue the new chat message email"""
+    enqueue_emails([build_new_message_email(task, message, recipient)])
+
+def build_chat_digest_email(task, recipient, messages, total):
+    """One email covering `total` unread chat messages (the newest few are quoted)"""
+    is_admin = hasattr(recipient, 'profile') and recipient.profile.role == 'admin'
+    context = {
+        'recipient_name': recipient.get_full_name() or recipient.username,
+        'task_title': task.title,
+        'message_count': total,
+        'more_count': total - len(messages),
+        'messages': [
+            {
+                'sender_name': m.sender.get_full_name() or m.sender.username,
+                'sent_at': timezone.localtime(m.created_at).strftime('%b %d, %H:%M'),
+                'preview': m.message[:300] + '...' if len(m.message) > 300 else (m.message or m.file_name or ''),
+            }
+            for m in messages
+        ],
+        'task_url': (f"{settings.FRONTEND_URL}/admin/dashboard" if is_admin
+                     else f"{settings.FRONTEND_URL}/client/dashboard/tasks/{task.id}"),
+    }
+    subject = f"{total} new message{'s' if total != 1 else ''} - Task: {task.title}"
+    return build_email(subject, 'emails/chat_digest.html', context,
+                       to=[recipient.email], from_email=settings.DEFAULT_FROM_EMAIL)
@@ -0,0 +1,105 @@
+# core/export.py
+"""
+Streaming exports of tasks, budget proposals and chat history.
+
+Rows come straight from `values_list().iterator(chunk_size=...)` — a
+server-side cursor on PostgreSQL — and are encoded one at a time, so memory
+stays flat however many rows are exported. Used by
+/api/admin/export/<dataset>.<ndjson|csv> and `manage.py export_data`.
+
+Under ASGI, Django reads a synchronous streaming iterator to the end before
+sending anything, so the view serves aiter_export() there: it pulls one
+chunk of lines at a time in the request's sync thread.
+"""
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import BudgetProposal, ChatMessage, Task
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# dataset -> (model, columns, lookup of the task status used by ?status=)
+DATASETS = {
+    'tasks': (Task, (
+        'id', 'task_id', 'status', 'priority', 'subject', 'title', 'education_level',
+        'client_id', 'client__username', 'client__email',
+        'assigned_admin_id', 'assigned_admin__username', 'category__name',
+        'deadline', 'progress', 'budget', 'proposed_budget', 'admin_counter_budget',
+        'negotiation_status', 'accepted_budget_source', 'estimated_hours', 'actual_hours',
+        'withdrawal_fee', 'created_at', 'updated_at', 'accepted_at', 'completed_at', 'rejected_at',
+    ), 'status'),
+    'budget_proposals': (BudgetProposal, (
+        'id', 'task_id', 'task__task_id', 'amount', 'description',
+        'proposed_by_id', 'proposed_by__username', 'is_approved', 'is_rejected', 'created_at',
+    ), 'task__status'),
+    'chat_messages': (ChatMessage, (
+        'id', 'task_id', 'task__task_id', 'sender_id', 'sender__username',
+        'message', 'file_name', 'file_url', 'created_at',
+    ), 'task__status'),
+}
+
+
+def export_rows(dataset, since=None, until=None, statuses=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield tuples of DATASETS[dataset] columns, oldest first."""
+    model, columns, status_lookup = DATASETS[dataset]
+    queryset = model.objects.all()
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    if statuses:
+        queryset = queryset.filter(**{f'{status_lookup}__in': statuses})
+    # Plain tuples: no model instances, no serializer, no prefetch cache
+    return queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def encode_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def encode_ndjson(columns, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def encode_export(dataset, fmt, rows):
+    columns = DATASETS[dataset][1]
+    if fmt == 'csv':
+        return encode_csv(columns, rows)
+    return encode_ndjson(columns, rows)
+
+
+async def aiter_export(lines, chunk_size=EXPORT_CHUNK_SIZE):
+    """Async iterator over encode_export() output, `chunk_size` lines per piece."""
+    lines = iter(lines)
+    # thread_sensitive: the DB cursor stays on the thread that opened it
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, chunk_size)), thread_sensitive=True)
+    while True:
+        chunk = await next_chunk()
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,125 @@
+# core/fieldsets.py
+"""
+Sparse fieldsets for the task and user APIs.
+
+    ?fields=id,title,status      render only these fields
+    ?expand=chat,files,client    add (or upgrade to the full form of) nested relations
+
+Serializers opt in with SparseFieldsetMixin and describe, per output field,
+which select_related / prefetch_related / only() entries it needs. Views
+build the queryset from that plan so that fields nobody asked for are never
+joined, prefetched or even selected.
+"""
+from django.core.exceptions import FieldDoesNotExist
+
+
+def parse_csv_param(request, name):
+    """Return the set of names in ?<name>=a,b,c, or None when the param is absent."""
+    if request is None:
+        return None
+    raw = request.query_params.get(name) if hasattr(request, 'query_params') else request.GET.get(name)
+    if raw is None:
+        return None
+    return {part.strip() for part in raw.split(',') if part.strip()}
+
+
+def fieldset_context(request):
+    """Serializer context entries for the fieldset carried by `request`."""
+    return {
+        'fields': parse_csv_param(request, 'fields'),
+        'expand': parse_csv_param(request, 'expand') or set(),
+    }
+
+
+def trim_fields(data, fields):
+    """Apply ?fields= to a hand-built dict response."""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin honouring `fields` / `expand` from the serializer context.
+
+    expandable_fields   name -> factory returning the field to add when expanded
+    query_plan          name -> {'select': [...], 'prefetch': [...], 'only': [...],
+                                 'apply': callable(queryset, context)}
+    expanded_query_plan same, used instead of query_plan for expanded fields
+
+    Plain model fields need no plan entry; their column is selected by name.
+    """
+    expandable_fields = {}
+    query_plan = {}
+    expanded_query_plan = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = set(self.context.get('expand') or ())
+        requested = self.context.get('fields')
+
+        self._expanded = expand & set(self.expandable_fields)
+        for name in self._expanded:
+            self.fields[name] = self.expandable_fields[name]()
+
+        if requested is not None:
+            keep = set(requested) | self._expanded
+            for name in list(self.fields):
+                if name not in keep and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+    def plan_for(self, name):
+        if name in self._expanded and name in self.expanded_query_plan:
+            return self.expanded_query_plan[name]
+        return self.query_plan.get(name)
+
+    def optimize_queryset(self, queryset, always=()):
+        """Reduce `queryset` to the joins, prefetches and columns the rendered fields need."""
+        model = queryset.model
+        select, prefetch, only = [], [], {'pk', *always}
+        appliers = []
+        can_trim = True
+
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            plan = self.plan_for(name)
+            if plan is None:
+                try:
+                    model._meta.get_field(field.source)
+                    only.add(field.source)
+                except FieldDoesNotExist:
+                    # Unknown computed field — don't risk deferred loads per row
+                    can_trim = False
+                continue
+            select.extend(plan.get('select', ()))
+            prefetch.extend(plan.get('prefetch', ()))
+            only.update(plan.get('only', ()))
+            if 'apply' in plan:
+                appliers.append(plan['apply'])
+
+        queryset = queryset.select_related(None)
+        if select:
+            queryset = queryset.select_related(*dict.fromkeys(select))
+        queryset = queryset.prefetch_related(None)
+        if prefetch:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+        if can_trim:
+            queryset = queryset.only(*only)
+        for apply in appliers:
+            queryset = apply(queryset, self.context)
+        return queryset
+
+
+class SparseFieldsetViewMixin:
+    """Generic-view side: pass the fieldset to the serializer and trim the queryset to match."""
+    fieldset_always_columns = ('created_at',)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(fieldset_context(self.request))
+        return context
+
+    def optimize_queryset(self, queryset):
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return serializer.optimize_queryset(queryset, always=self.fieldset_always_columns)
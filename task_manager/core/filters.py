@@ -0,0 +1,140 @@
+# core/filters.py
+"""
+Server-side filtering and sorting for task lists.
+
+    ?status=submitted,in_progress     any of these statuses
+    ?open=1                           only statuses that can still move on
+    ?assigned_admin=<id>|none         assignee (none = unassigned queue)
+    ?client=<id>                      (admins) one client's tasks
+    ?category=<id>[,<id>]
+    ?priority=high,urgent
+    ?deadline_after=<date|datetime>   deadline >= value
+    ?deadline_before=<date|datetime>  deadline <  value
+    ?sort=-created_at | created_at | deadline | -deadline | priority | -priority
+
+Every sort ends on `id` so it is total and can drive keyset pagination; the
+combinations are backed by the composite / partial indexes on Task.Meta.
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .fieldsets import parse_csv_param
+from .models import OPEN_TASK_STATUSES, PRIORITY_ORDER, Task
+
+
+def _parse_ids(values, name):
+    try:
+        return {int(value) for value in values}
+    except ValueError:
+        raise ValidationError({name: 'Expected a comma-separated list of ids.'})
+
+
+def parse_moment(raw, name):
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw)
+        if day is None:
+            raise ValidationError({name: 'Expected a date or datetime.'})
+        value = datetime.combine(day, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _choice_set(request, name, choices):
+    values = parse_csv_param(request, name)
+    if values is None:
+        return None
+    unknown = values - set(choices)
+    if unknown:
+        raise ValidationError({name: f"Unknown value(s): {', '.join(sorted(unknown))}."})
+    return values
+
+
+class TaskFilter:
+    """Apply ?status= / ?priority= / ... and ?sort= to a visible-task queryset."""
+
+    # sort key -> keyset ordering (column, id), same direction for both
+    sorts = {
+        '-created_at': ('-created_at', '-id'),
+        'created_at': ('created_at', 'id'),
+        'deadline': ('deadline', 'id'),
+        '-deadline': ('-deadline', '-id'),
+        'priority': ('priority_rank', 'id'),
+        '-priority': ('-priority_rank', '-id'),
+    }
+    default_sort = '-created_at'
+
+    def __init__(self, request):
+        self.request = request
+        params = request.query_params
+
+        self.statuses = _choice_set(request, 'status', [value for value, _ in Task.STATUS_CHOICES])
+        self.priorities = _choice_set(request, 'priority', PRIORITY_ORDER)
+        self.open_only = params.get('open') in ('1', 'true', 'True')
+
+        categories = parse_csv_param(request, 'category')
+        self.categories = _parse_ids(categories, 'category') if categories is not None else None
+
+        admin = params.get('assigned_admin')
+        if admin in (None, ''):
+            self.assigned_admin = None
+        elif admin == 'none':
+            self.assigned_admin = 'none'
+        else:
+            self.assigned_admin = next(iter(_parse_ids([admin], 'assigned_admin')))
+
+        client = params.get('client')
+        self.client = next(iter(_parse_ids([client], 'client'))) if client else None
+
+        after, before = params.get('deadline_after'), params.get('deadline_before')
+        self.deadline_after = parse_moment(after, 'deadline_after') if after else None
+        self.deadline_before = parse_moment(before, 'deadline_before') if before else None
+
+        sort = params.get('sort') or self.default_sort
+        if sort not in self.sorts:
+            raise ValidationError({'sort': f"Expected one of: {', '.join(self.sorts)}."})
+        self.sort = sort
+
+    @property
+    def ordering(self):
+        return self.sorts[self.sort]
+
+    def filter_queryset(self, queryset):
+        if self.statuses is not None:
+            queryset = queryset.filter(status__in=self.statuses)
+        if self.open_only:
+            queryset = queryset.filter(status__in=OPEN_TASK_STATUSES)
+        if self.priorities is not None:
+            queryset = queryset.filter(priority__in=self.priorities)
+        if self.categories is not None:
+            queryset = queryset.filter(category_id__in=self.categories)
+        if self.assigned_admin == 'none':
+            queryset = queryset.filter(assigned_admin__isnull=True)
+        elif self.assigned_admin is not None:
+            queryset = queryset.filter(assigned_admin_id=self.assigned_admin)
+        if self.client is not None:
+            queryset = queryset.filter(client_id=self.client)
+        if self.deadline_after is not None:
+            queryset = queryset.filter(deadline__gte=self.deadline_after)
+        if self.deadline_before is not None:
+            queryset = queryset.filter(deadline__lt=self.deadline_before)
+
+        if self.sort in ('priority', '-priority'):
+            queryset = queryset.with_priority_rank()
+        return queryset.order_by(*self.ordering)
+
+
+class TaskFilterViewMixin:
+    """
+    For generic task list views: filters get_queryset() and hands the sort
+    to KeysetPagination through `keyset_ordering`.
+    """
+
+    def filter_queryset(self, queryset):
+        task_filter = TaskFilter(self.request)
+        self.keyset_ordering = task_filter.ordering
+        return task_filter.filter_queryset(super().filter_queryset(queryset))
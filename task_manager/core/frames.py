@@ -0,0 +1,69 @@
+# core/frames.py
+"""
+WebSocket frame encodings.
+
+A client picks one with the WebSocket subprotocol when it connects:
+
+    new WebSocket(url, ["msgpack", "json"])
+
+- "json" (also what a client offering no subprotocol gets): compact JSON
+  text frames;
+- "msgpack": binary MessagePack frames. Such a client may send its own
+  frames as MessagePack too.
+
+Group events are encoded by whoever sends them, not by every socket that
+receives them: the group message carries the frames already serialized in
+each encoding ({'type': ..., 'frames': [{'json': str, 'msgpack': bytes}]})
+and the consumers only pick their socket's copy. The outbox drainer encodes
+a task event once and sends the result to all of its groups.
+"""
+import json
+
+import msgpack
+import ujson
+
+# Server preference when a client offers several
+ENCODINGS = ('msgpack', 'json')
+DEFAULT_ENCODING = 'json'
+
+
+def negotiate(subprotocols):
+    """(encoding, subprotocol to accept) for the client's offered subprotocols."""
+    for subprotocol in subprotocols or ():
+        if subprotocol in ENCODINGS:
+            return subprotocol, subprotocol
+    return DEFAULT_ENCODING, None
+
+
+def encode_frame(frame):
+    """`frame` serialized once per encoding."""
+    return {
+        'json': ujson.dumps(frame, ensure_ascii=False, escape_forward_slashes=False),
+        'msgpack': msgpack.packb(frame, use_bin_type=True),
+    }
+
+
+def packed(frame, event_type=None):
+    """The group message delivering `frame` (handled by the consumer method named after its type)."""
+    return {'type': event_type or frame['type'], 'frames': [encode_frame(frame)]}
+
+
+def pack_event(event):
+    """
+    Pre-encode a task event as queued in the outbox (core.broadcast). A bulk
+    tasks_updated message becomes one frame per task.
+    """
+    if 'frames' in event:
+        return event
+    if event.get('type') == 'tasks_updated':
+        events = list(event.get('events', ()))
+        # Messages queued before versioned events carried whole tasks
+        events.extend({'type': 'task_updated', 'task': task} for task in event.get('tasks', ()))
+        return {'type': 'tasks_updated', 'frames': [encode_frame(e) for e in events]}
+    return packed(event)
+
+
+def decode_frame(text_data=None, bytes_data=None):
+    if bytes_data is not None:
+        return msgpack.unpackb(bytes_data, raw=False)
+    return json.loads(text_data)
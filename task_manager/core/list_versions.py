@@ -0,0 +1,69 @@
+# core/list_versions.py
+"""
+Version counters for the ETags of polled lists (core.conditional).
+
+A list's validator has to change whenever its response would, and checking
+it must cost far less than building the response. Aggregates over the
+listed rows (MAX(updated_at), COUNT, SUM(version)) scan every row the
+viewer can see on every poll. Instead, each list has a ListVersion row per
+scope, and its validator is a primary-key lookup of the scopes it depends
+on:
+
+- 'tasks': every task (what admins list);
+- 'tasks:client:<id>': one client's tasks;
+- 'categories': task categories, embedded in every task;
+- 'notifications:<user id>': one user's notifications.
+
+Writes that can change a list bump its scopes once their transaction has
+committed, as a short UPDATE of their own, so the busy 'tasks' row is never
+locked for the length of a request. A poll landing between a commit and its
+bump is answered from the old version once; the next poll sees the change.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import ListVersion
+
+TASKS = 'tasks'
+CATEGORIES = 'categories'
+
+
+def client_tasks(client_id):
+    return f"tasks:client:{client_id}"
+
+
+def notifications(user_id):
+    return f"notifications:{user_id}"
+
+
+def task_scope(user):
+    """The scope of the tasks `user` can see (views.visible_tasks)."""
+    profile = getattr(user, 'profile', None)
+    return TASKS if profile is not None and profile.role == 'admin' else client_tasks(user.pk)
+
+
+def _bump(scopes):
+    bumped = ListVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1)
+    if bumped < len(scopes):
+        # First change of a scope; a concurrent first bump covers ours too
+        ListVersion.objects.bulk_create(
+            [ListVersion(scope=scope, version=1) for scope in scopes], ignore_conflicts=True,
+        )
+
+
+def bump(*scopes):
+    """Move the version of `scopes` once the current transaction commits."""
+    scopes = sorted(set(scopes))
+    if scopes:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def bump_tasks(*client_ids):
+    """Tasks of these clients changed: their lists and the admins' list."""
+    bump(TASKS, *(client_tasks(client_id) for client_id in client_ids))
+
+
+def versions(*scopes):
+    """The current version of each scope, in order, in one query."""
+    found = dict(ListVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    return tuple(found.get(scope, 0) for scope in scopes)
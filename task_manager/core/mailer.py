@@ -0,0 +1,96 @@
+# core/mailer.py
+"""
+Batched email delivery.
+
+core.email_service builds the messages; they are queued as 'email' outbox
+rows (core.outbox.enqueue_emails) and the drainer hands each batch to
+deliver(), which sends it over one backend session instead of one
+connection (and TLS handshake) per email.
+"""
+from functools import lru_cache
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+
+@lru_cache(maxsize=None)
+def _template(name):
+    # Compiled once per process, whatever the loader configuration
+    return get_template(name)
+
+
+def render_email(template_name, context):
+    """(html, plain text) bodies for `template_name`."""
+    html = _template(template_name).render(context)
+    return html, strip_tags(html)
+
+
+def build_email(subject, template_name, context, to, from_email=None):
+    html, plain = render_email(template_name, context)
+    email = EmailMultiAlternatives(subject=subject, body=plain, from_email=from_email, to=to)
+    email.attach_alternative(html, "text/html")
+    return email
+
+
+def email_payload(email):
+    """JSON-safe form of an EmailMultiAlternatives, for the outbox."""
+    return {
+        'subject': email.subject,
+        'body': email.body,
+        'from_email': email.from_email,
+        'to': list(email.to),
+        'cc': list(email.cc),
+        'bcc': list(email.bcc),
+        'reply_to': list(email.reply_to),
+        'alternatives': [[content, mimetype] for content, mimetype in getattr(email, 'alternatives', [])],
+    }
+
+
+def email_from_payload(payload):
+    email = EmailMultiAlternatives(
+        subject=payload['subject'],
+        body=payload['body'],
+        from_email=payload['from_email'],
+        to=payload['to'],
+        cc=payload.get('cc'),
+        bcc=payload.get('bcc'),
+        reply_to=payload.get('reply_to'),
+    )
+    for content, mimetype in payload.get('alternatives', []):
+        email.attach_alternative(content, mimetype)
+    return email
+
+
+def deliver(messages, connection=None):
+    """
+    Send `messages` over one backend session; returns (indexes sent,
+    {index: error}). A failure restarts the session for the remaining
+    messages, since an SMTP error often leaves the connection unusable.
+    """
+    connection = connection or get_connection()
+    sent, errors = [], {}
+    try:
+        connection.open()
+    except Exception as e:
+        return sent, {i: repr(e) for i in range(len(messages))}
+
+    try:
+        for i, message in enumerate(messages):
+            try:
+                connection.send_messages([message])
+                sent.append(i)
+            except Exception as e:
+                errors[i] = repr(e)
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception as e:
+                    errors.update((j, repr(e)) for j in range(i + 1, len(messages)))
+                    break
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    return sent, errors
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+
+from core.email_service import build_task_status_email
+from core.mailer import deliver
+from core.models import Task
+
+BACKENDS = {
+    'console': 'django.core.mail.backends.console.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend',
+}
+
+
+def stand_in(backend, handshake):
+    """`backend` with `handshake` seconds added to every new session, counting them."""
+    base = get_connection(backend).__class__
+
+    class StandIn(base):
+        sessions = 0
+
+        def open(self):
+            if not getattr(self, '_session', False):
+                time.sleep(handshake)
+                StandIn.sessions += 1
+                self._session = True
+            return super().open()
+
+        def close(self):
+            self._session = False
+            return super().close()
+
+    return StandIn
+
+
+class Command(BaseCommand):
+    help = "Compare pooled vs per-email delivery of task status updates against a local backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--backend', choices=sorted(BACKENDS), default='file')
+        parser.add_argument('--handshake-ms', type=float, default=50.0,
+                            help="simulated connect + TLS cost per session (0 for the raw backend)")
+        parser.add_argument('--skip-per-email', action='store_true', help="only run the pooled delivery")
+
+    def handle(self, *args, count, backend, handshake_ms, skip_per_email, **options):
+        # Unsaved objects: rendering needs no database
+        student = User(username='bench', first_name='Bench', email='bench@example.com')
+        task = Task(id=1, title='Benchmark task', status='in_progress')
+
+        started = time.perf_counter()
+        messages = [build_task_status_email(task, student, f"Update #{i}") for i in range(count)]
+        self.report('render', count, time.perf_counter() - started)
+
+        kwargs = {}
+        if backend == 'console':
+            kwargs['stream'] = open(os.devnull, 'w')
+        elif backend == 'file':
+            kwargs['file_path'] = tempfile.mkdtemp(prefix='bench_mail_')
+        backend_cls = stand_in(BACKENDS[backend], handshake_ms / 1000)
+
+        started = time.perf_counter()
+        sent, errors = deliver(messages, connection=backend_cls(**kwargs))
+        self.report('pooled', len(sent), time.perf_counter() - started, backend_cls.sessions, errors)
+
+        if not skip_per_email:
+            backend_cls.sessions = 0
+            started = time.perf_counter()
+            errors = {}
+            for i, message in enumerate(messages):
+                try:
+                    backend_cls(**kwargs).send_messages([message])
+                except Exception as e:
+                    errors[i] = repr(e)
+            self.report('per-email', count - len(errors), time.perf_counter() - started,
+                        backend_cls.sessions, errors)
+
+        if backend == 'file':
+            self.stdout.write(f"messages written to {kwargs['file_path']}")
+
+    def report(self, label, count, elapsed, sessions=None, errors=None):
+        rate = count / elapsed if elapsed else float('inf')
+        line = f"{label:>9}: {count} in {elapsed:.3f}s ({rate:,.0f}/s)"
+        if sessions is not None:
+            line += f", {sessions} session(s)"
+        if errors:
+            line += f", {len(errors)} failed (first: {next(iter(errors.values()))})"
+        self.stdout.write(line)
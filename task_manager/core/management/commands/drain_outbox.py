@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import OUTBOX_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = "Send pending outbox messages (once, or continuously with --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="keep draining until interrupted")
+        parser.add_argument('--interval', type=float, default=1.0, help="seconds to sleep when idle")
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+
+    def handle(self, *args, loop, interval, batch_size, **options):
+        while True:
+            sent = drain(batch_size)
+            if sent:
+                self.stdout.write(f"sent {sent}")
+            if not loop:
+                return
+            if not sent:
+                time.sleep(interval)
@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from core.export import DATASETS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, encode_export, export_rows
+from core.filters import parse_moment
+
+
+class Command(BaseCommand):
+    help = "Stream tasks, budget proposals or chat messages as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--since', help="created_at >= this date/datetime")
+        parser.add_argument('--until', help="created_at < this date/datetime")
+        parser.add_argument('--status', help="comma-separated task statuses")
+        parser.add_argument('--output', '-o', help="file to write (default: stdout)")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, dataset, fmt, since, until, status, output, chunk_size, **options):
+        try:
+            since = parse_moment(since, 'since') if since else None
+            until = parse_moment(until, 'until') if until else None
+        except ValidationError as e:
+            field, message = next(iter(e.detail.items()))
+            raise CommandError(f"--{field}: {message}")
+        statuses = {part.strip() for part in status.split(',') if part.strip()} if status else None
+
+        rows = export_rows(dataset, since=since, until=until, statuses=statuses, chunk_size=chunk_size)
+        stream = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        try:
+            for chunk in encode_export(dataset, fmt, rows):
+                stream.write(chunk)
+        finally:
+            if output:
+                stream.close()
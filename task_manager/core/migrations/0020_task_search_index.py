@@ -0,0 +1,44 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Full-text index for core.search. PostgreSQL only: other backends use the
+# LIKE fallback and get nothing here. The vector must match
+# core.search.task_search_vector() exactly or the planner won't use it.
+# task_id prefix matches are already served by the varchar_pattern_ops
+# "_like" index Django creates for the unique task_id column.
+SEARCH_CONFIG = 'english'
+
+
+def search_index():
+    return GinIndex(
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('subject', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG),
+        name='core_task_search_idx',
+    )
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Task = apps.get_model('core', 'Task')
+    schema_editor.add_index(Task, search_index())
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Task = apps.get_model('core', 'Task')
+    schema_editor.remove_index(Task, search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_task_delta_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_task_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('submitted', 'Submitted'), ('budget_negotiation', 'Budget Negotiation'), ('in_progress', 'In Progress'), ('awaiting_review', 'Awaiting Review'), ('revision_requested', 'Revision Requested'), ('completed', 'Completed'), ('withdrawn', 'Withdrawn'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='submitted', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='core_task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'deadline', 'id'], name='core_task_status_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(models.F('status'), models.Case(models.When(priority='low', then=models.Value(0)), models.When(priority='medium', then=models.Value(1)), models.When(priority='high', then=models.Value(2)), models.When(priority='urgent', then=models.Value(3)), default=models.Value(1), output_field=models.SmallIntegerField()), models.F('id'), name='core_task_status_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(models.Case(models.When(priority='low', then=models.Value(0)), models.When(priority='medium', then=models.Value(1)), models.When(priority='high', then=models.Value(2)), models.When(priority='urgent', then=models.Value(3)), default=models.Value(1), output_field=models.SmallIntegerField()), models.F('id'), name='core_task_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_admin', 'status', '-created_at'], name='core_task_admin_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='core_task_client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['category', '-created_at'], name='core_task_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ('submitted', 'budget_negotiation', 'in_progress', 'awaiting_review', 'revision_requested'))), fields=['deadline', 'id'], name='core_task_open_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('assigned_admin__isnull', True)), fields=['-created_at', '-id'], name='core_task_unassigned_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='deadline_reminders_sent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
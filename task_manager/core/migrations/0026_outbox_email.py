@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='kind',
+            field=models.CharField(choices=[('task', 'Celery task'), ('broadcast', 'Channel layer broadcast'), ('email', 'Email')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max
+
+# Per-message is_read flags become per-(user, task) read cursors. Each side
+# starts at the newest message of the other side that was flagged read: the
+# client's cursor, and the assigned admin's (or, unassigned, the cursor of
+# the last admin who wrote in the task) for the admins' shared position.
+
+
+def seed_cursors(apps, schema_editor):
+    ChatMessage = apps.get_model('core', 'ChatMessage')
+    ChatReadCursor = apps.get_model('core', 'ChatReadCursor')
+    read = ChatMessage.objects.filter(is_read=True).order_by()
+
+    cursors = [
+        ChatReadCursor(task_id=task_id, user_id=client_id, last_read_message_id=newest)
+        for task_id, client_id, newest in read.exclude(sender=F('task__client'))
+        .values('task', 'task__client').annotate(m=Max('id')).values_list('task', 'task__client', 'm')
+    ]
+    for task_id, client_id, admin_id, newest in (
+        read.filter(sender=F('task__client'))
+        .values('task', 'task__client', 'task__assigned_admin').annotate(m=Max('id'))
+        .values_list('task', 'task__client', 'task__assigned_admin', 'm')
+    ):
+        if admin_id is None:
+            admin_id = (
+                ChatMessage.objects.filter(task_id=task_id).exclude(sender_id=client_id)
+                .order_by('-id').values_list('sender_id', flat=True).first()
+            )
+        if admin_id is not None:
+            cursors.append(ChatReadCursor(task_id=task_id, user_id=admin_id, last_read_message_id=newest))
+    ChatReadCursor.objects.bulk_create(cursors, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_chat_message_client_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatReadCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='chatreadcursor',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_cursors', to='core.task'),
+        ),
+        migrations.AddField(
+            model_name='chatreadcursor',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_cursors', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='chatreadcursor',
+            constraint=models.UniqueConstraint(fields=('task', 'user'), name='core_chatcursor_task_user_uniq'),
+        ),
+        migrations.RunPython(seed_cursors, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='chatmessage',
+            name='core_chatmsg_unread_idx',
+        ),
+        migrations.RemoveField(
+            model_name='chatmessage',
+            name='is_read',
+        ),
+        migrations.RemoveField(
+            model_name='chatmessage',
+            name='read_at',
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['task', 'id'], name='core_chatmsg_task_id_idx'),
+        ),
+    ]
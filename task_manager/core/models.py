@@ -4,6 +4,8 @@ from django.contrib.auth.models import AbstractUser
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 class UserProfile(models.Model):
@@ -59,6 +61,7 @@ class TaskCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
@@ -67,6 +70,67 @@ class TaskCategory(models.Model):
     def __str__(self):
         return self.name
 
+# Statuses a task can still move on from; see the partial deadline index
+OPEN_TASK_STATUSES = ('submitted', 'budget_negotiation', 'in_progress', 'awaiting_review', 'revision_requested')
+PRIORITY_ORDER = ('low', 'medium', 'high', 'urgent')
+
+
+def priority_rank():
+    """low=0 .. urgent=3. Also the expression indexed by core_task_*priority_idx."""
+    return models.Case(
+        *(models.When(priority=value, then=models.Value(rank)) for rank, value in enumerate(PRIORITY_ORDER)),
+        default=models.Value(1),
+        output_field=models.SmallIntegerField(),
+    )
+
+
+def chat_read_position(side):
+    """
+    Expression for the newest message id the task's client (`side` 'client')
+    or its admins ('staff') have read; 0 before anyone read anything.
+    """
+    cursors = ChatReadCursor.objects.filter(task=models.OuterRef('pk'))
+    if side == 'client':
+        cursors = cursors.filter(user=models.OuterRef('client'))
+    else:
+        cursors = cursors.exclude(user=models.OuterRef('client'))
+    cursors = cursors.order_by().values('task').annotate(m=models.Max('last_read_message_id')).values('m')
+    return Coalesce(models.Subquery(cursors, output_field=models.BigIntegerField()), 0)
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_priority_rank(self):
+        return self.annotate(priority_rank=priority_rank())
+
+    def with_read_positions(self):
+        """Annotate `client_read_id` / `staff_read_id`: how far each side has read the chat."""
+        return self.annotate(client_read_id=chat_read_position('client'), staff_read_id=chat_read_position('staff'))
+
+    def with_unread_counts(self, user):
+        """
+        Annotate `unread_count` for `user` with one correlated subquery, so a
+        list of N tasks costs one query instead of N+1.
+        Clients count admin messages past their read cursor, admins count
+        client messages past the admins' (see ChatReadCursor).
+        """
+        profile = getattr(user, 'profile', None)
+        role = getattr(profile, 'role', 'client') if profile else 'client'
+
+        # A range on the (task, id) index instead of a scan of per-message flags
+        unread = ChatMessage.objects.filter(task=models.OuterRef('pk'), id__gt=models.OuterRef('chat_read_id'))
+        if role == 'client':
+            unread = unread.exclude(sender=models.OuterRef('client'))
+        else:
+            unread = unread.filter(sender=models.OuterRef('client'))
+        unread = unread.order_by().values('task').annotate(c=models.Count('id')).values('c')
+
+        return self.annotate(
+            chat_read_id=chat_read_position('client' if role == 'client' else 'staff')
+        ).annotate(
+            unread_count=Coalesce(models.Subquery(unread, output_field=models.IntegerField()), 0)
+        )
+
+
 class Task(models.Model):
     STATUS_CHOICES = (
         ('submitted', 'Submitted'),
@@ -111,7 +175,7 @@ class Task(models.Model):
     deadline = models.DateTimeField()
 
     # Status & Progress
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='submitted', db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='submitted')
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
     progress = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(100)])
 
@@ -161,12 +225,51 @@ class Task(models.Model):
     withdrawal_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     can_withdraw_free = models.BooleanField(default=True)
 
+    # Bumped on every save and on file/revision/chat writes (see core.signals);
+    # keys the serialized-task cache
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # How many DEADLINE_REMINDER_TIERS have fired for the current deadline (core.reminders)
+    deadline_reminders_sent = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination: WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='core_task_created_id_idx'),
+            # Delta sync: WHERE (updated_at, id) > cursor [AND client_id = ?]
+            models.Index(fields=['updated_at', 'id'], name='core_task_updated_id_idx'),
+            models.Index(fields=['client', 'updated_at'], name='core_task_client_updated_idx'),
+            # Filter / sort combinations of core.filters.TaskFilter. status leads
+            # (it also replaces the old single-column status index).
+            models.Index(fields=['status', '-created_at', '-id'], name='core_task_status_created_idx'),
+            models.Index(fields=['status', 'deadline', 'id'], name='core_task_status_deadline_idx'),
+            models.Index(models.F('status'), priority_rank(), models.F('id'), name='core_task_status_priority_idx'),
+            models.Index(priority_rank(), models.F('id'), name='core_task_priority_idx'),
+            models.Index(fields=['assigned_admin', 'status', '-created_at'], name='core_task_admin_status_idx'),
+            models.Index(fields=['client', '-created_at', '-id'], name='core_task_client_created_idx'),
+            models.Index(fields=['category', '-created_at'], name='core_task_category_created_idx'),
+            # Dashboard "due soon" (open tasks by deadline) and the unassigned queue
+            models.Index(
+                fields=['deadline', 'id'], name='core_task_open_deadline_idx',
+                condition=models.Q(status__in=OPEN_TASK_STATUSES),
+            ),
+            models.Index(
+                fields=['-created_at', '-id'], name='core_task_unassigned_idx',
+                condition=models.Q(assigned_admin__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.task_id or 'DRAFT'}: {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_deadline = instance.__dict__.get('deadline')
+        return instance
+
     def save(self, *args, **kwargs):
         is_new = not self.pk
 
@@ -178,6 +281,35 @@ class Task(models.Model):
             super().save(update_fields=['task_id', 'withdrawal_deadline'])
             return
 
+        # Incremented in the UPDATE itself: concurrent saves and the F() bumps of
+        # child writes never hand two states the same version (core.cache keys on it).
+        # updated_at goes along even with update_fields, for delta sync (core.sync)
+        self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            missing = [name for name in ('version', 'updated_at') if name not in update_fields]
+            kwargs['update_fields'] = update_fields = list(update_fields) + missing
+
+        # A moved deadline re-arms the reminder tiers. Otherwise the counter is
+        # left out of the UPDATE: core.reminders advances it with its own UPDATE,
+        # and a full save from an instance loaded earlier would write back a
+        # stale count and fire a tier twice.
+        if update_fields is None or 'deadline' in update_fields:
+            loaded_deadline = getattr(self, '_loaded_deadline', None)
+            deadline_moved = loaded_deadline is not None and self.deadline != loaded_deadline
+            if deadline_moved:
+                self.deadline_reminders_sent = 0
+                if update_fields is not None:
+                    kwargs['update_fields'] = list(update_fields) + ['deadline_reminders_sent']
+            elif update_fields is None and not self._state.adding:
+                deferred = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                    and field.name != 'deadline_reminders_sent'
+                ]
+            self._loaded_deadline = self.deadline
+
         # Handle timezone string → object
         if self.timezone_str and not self.timezone:
             tz, _ = Timezone.objects.get_or_create(
@@ -210,12 +342,85 @@ class Task(models.Model):
                 self.budget = self.admin_counter_budget or 0
 
         super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
 
     def unread_messages_count(self, user):
-        if user == self.client:
-            return self.messages.filter(is_read=False, sender__profile__role='admin').count()
-        else:
-            return self.messages.filter(is_read=False, sender=self.client).count()
+        side = 'client' if user.pk == self.client_id else 'staff'
+        read = Task.objects.filter(pk=self.pk).annotate(read=chat_read_position(side)).values('read')
+        unread = self.messages.filter(id__gt=models.Subquery(read))
+        if side == 'client':
+            return unread.exclude(sender_id=self.client_id).count()
+        return unread.filter(sender_id=self.client_id).count()
+
+class TaskTombstone(models.Model):
+    """Marks a task that left a client's view (deleted or withdrawn) for delta sync."""
+    REASON_CHOICES = (
+        ('deleted', 'Deleted'),
+        ('withdrawn', 'Withdrawn'),
+    )
+    # Plain ids, not FKs: the task is gone, and the client may be going with it
+    task_pk = models.BigIntegerField()
+    task_id = models.CharField(max_length=20, blank=True, null=True)
+    client_pk = models.BigIntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['client_pk', 'id'], name='core_tombstone_client_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id or self.task_pk} ({self.reason})"
+
+    @classmethod
+    def record(cls, task, reason):
+        return cls.objects.create(task_pk=task.pk, task_id=task.task_id, client_pk=task.client_id, reason=reason)
+
+class ListVersion(models.Model):
+    """A counter bumped whenever a polled list changes; see core.list_versions."""
+    scope = models.CharField(max_length=64, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
+
+class OutboxMessage(models.Model):
+    """
+    A side effect (Celery job, channel-layer broadcast or email) recorded in the same
+    transaction as the change that caused it; core.outbox sends it later.
+    """
+    KIND_CHOICES = (
+        ('task', 'Celery task'),
+        ('broadcast', 'Channel layer broadcast'),
+        ('email', 'Email'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The drain query: pending rows and expired leases that are due, oldest first
+            models.Index(fields=['available_at', 'id'], name='core_outbox_due_idx',
+                         condition=models.Q(status__in=('pending', 'sending'))),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
 
 class TaskFile(models.Model):
     FILE_TYPE_CHOICES = (
@@ -258,12 +463,20 @@ class ChatMessage(models.Model):
     file = models.FileField(upload_to='chat_files/%Y/%m/%d/', blank=True, null=True)
     file_name = models.CharField(max_length=255, blank=True, null=True)  # ADDED THIS FIELD
     file_url = models.URLField(blank=True, null=True)  # ADDED THIS FIELD
-    is_read = models.BooleanField(default=False)
-    read_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Sender-generated id of socket messages (core/chat_buffer.py): makes resends idempotent
+    client_id = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Unread counts are ranges past a read cursor (ChatReadCursor)
+            models.Index(fields=['task', 'id'], name='core_chatmsg_task_id_idx'),
+        ]
+        constraints = [
+            # Not partial, so bulk_create can target it with ON CONFLICT (NULLs never clash)
+            models.UniqueConstraint(fields=['sender', 'client_id'], name='core_chatmsg_client_id_uniq'),
+        ]
 
     @property
     def sender_role(self):
@@ -273,11 +486,47 @@ class ChatMessage(models.Model):
     def time_str(self):
         return self.created_at.strftime("%H:%M")
 
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+class ChatReadCursor(models.Model):
+    """
+    How far `user` has read a task's chat: messages up to last_read_message_id
+    are read (core/chat_read.py). A task's admins share the furthest of their
+    cursors as one read position.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='read_cursors')
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='chat_read_cursors')
+    last_read_message_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user'], name='core_chatcursor_task_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read task {self.task_id} up to {self.last_read_message_id}"
+
+class ChatDigest(models.Model):
+    """
+    Email digest state for one recipient of one task's chat (core/digests.py).
+    due_at is set by the first unread message after a digest and cleared when
+    the next digest goes out; last_message_id is the newest message covered.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='chat_digests')
+    recipient = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='chat_digests')
+    due_at = models.DateTimeField(null=True, blank=True)
+    last_message_id = models.BigIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'recipient'], name='core_chatdigest_task_recipient_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['due_at'], name='core_chatdigest_due_idx', condition=models.Q(due_at__isnull=False)),
+        ]
+
+    def __str__(self):
+        return f"Digest for {self.recipient_id} on task {self.task_id}"
 
 class Notification(models.Model):
     NOTIFICATION_TYPES = (
@@ -299,6 +548,12 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's notification list / keyset pages
+            models.Index(fields=['user', '-created_at', '-id'], name='core_notif_user_created_idx'),
+            # Unread badge count (core/notifications.py)
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='core_notif_unread_idx'),
+        ]
 
 class BudgetProposal(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='budget_proposals')
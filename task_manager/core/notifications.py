@@ -0,0 +1,121 @@
+# core/notifications.py
+"""
+Per-user unread notification counter.
+
+The badge count lives in the cache (settings.NOTIFICATION_COUNT_CACHE) and
+is adjusted incrementally: +n when unread notifications are created, -n
+when they are read or deleted. A missing key is rebuilt with one COUNT
+served by the partial index core_notif_unread_idx; a key that is missing
+when we want to adjust it is simply left for that rebuild. Adjustments run
+on commit, so a rolled-back write never moves the count and a rebuild can't
+be double-counted by a change it hasn't seen yet. Entries expire after
+NOTIFICATION_COUNT_TIMEOUT so any drift heals on its own.
+
+The cache must be shared by every process that writes notifications (web,
+Celery, outbox drainer), so it defaults to Redis when REDIS_URL is set.
+Without one every unread_count() is the COUNT itself.
+
+bulk_create / queryset.update() skip model signals, so code writing
+notifications in bulk reports the change here itself.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+
+from . import list_versions
+from .models import Notification
+
+
+def _cache():
+    alias = getattr(settings, 'NOTIFICATION_COUNT_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _key(user_id):
+    return f"notif_unread:{user_id}"
+
+
+def unread_count(user_id):
+    cache = _cache()
+    count = cache.get(_key(user_id)) if cache is not None else None
+    if count is None or count < 0:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        if cache is not None:
+            cache.set(_key(user_id), count, getattr(settings, 'NOTIFICATION_COUNT_TIMEOUT', 3600))
+    return count
+
+
+def _incr(cache, user_id, delta):
+    try:
+        cache.incr(_key(user_id), delta)
+    except ValueError:
+        # Not cached: the next unread_count() counts from the index
+        pass
+
+
+def adjust_unread(user_id, delta):
+    cache = _cache()
+    if not delta or cache is None:
+        return
+    transaction.on_commit(lambda: _incr(cache, user_id, delta))
+
+
+def notifications_created(notifications):
+    """Account for notifications written with bulk_create()."""
+    for user_id, count in Counter(n.user_id for n in notifications if not n.is_read).items():
+        adjust_unread(user_id, count)
+    list_versions.bump(*(list_versions.notifications(n.user_id) for n in notifications))
+
+
+def admin_recipient_ids():
+    """Active admins, in one query."""
+    return list(User.objects.filter(profile__role='admin', is_active=True).values_list('id', flat=True))
+
+
+def fan_out(user_ids, title, message, task_id=None, notification_type='system'):
+    """The same notification for every user in `user_ids`, as one INSERT."""
+    created = Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            task_id=task_id,
+        )
+        for user_id in user_ids
+    ])
+    notifications_created(created)
+    return created
+
+
+def forget_unread(user_id):
+    cache = _cache()
+    if cache is not None:
+        transaction.on_commit(lambda: cache.delete(_key(user_id)))
+
+
+def mark_read(user, ids=None):
+    """Mark `ids` (or everything) read for `user` in one UPDATE; returns rows changed."""
+    unread = Notification.objects.filter(user=user, is_read=False)
+    if ids is not None:
+        unread = unread.filter(pk__in=ids)
+    changed = unread.update(is_read=True)
+    if changed:
+        list_versions.bump(list_versions.notifications(user.pk))
+    if ids is None:
+        # Recount rather than assume 0: something may have arrived meanwhile
+        forget_unread(user.pk)
+    else:
+        adjust_unread(user.pk, -changed)
+    return changed
+
+
+def mark_unread(user, ids):
+    changed = Notification.objects.filter(user=user, is_read=True, pk__in=ids).update(is_read=False)
+    adjust_unread(user.pk, changed)
+    if changed:
+        list_versions.bump(list_versions.notifications(user.pk))
+    return changed
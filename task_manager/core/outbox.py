@@ -0,0 +1,216 @@
+# core/outbox.py
+"""
+Transactional outbox for side effects of a write.
+
+Views record Celery jobs (notifications), channel-layer broadcasts and
+emails as OutboxMessage rows in the same transaction as the state change,
+instead of calling .delay() / group_send / send() directly. A rolled-back
+write therefore leaves nothing behind, and the request never waits on the
+broker, Redis or SMTP.
+
+drain() sends pending rows in id order, in batches claimed with SKIP LOCKED
+so several drainers can run at once (the drain_outbox beat task, or
+`manage.py drain_outbox --loop`). Claiming a batch is a short transaction
+that marks its rows 'sending' with a lease of OUTBOX_LEASE; the sends run
+outside any transaction and a second short transaction records the outcome.
+The emails of a batch share one mail backend session (core.mailer.deliver).
+A failed row is retried with exponential backoff and marked 'failed' after
+OUTBOX_MAX_ATTEMPTS. Delivery is at-least-once: rows of a drainer that dies
+mid-batch are claimed again once their lease runs out and resent, which the
+receivers (notification rows, idempotent frames) tolerate.
+"""
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .frames import pack_event
+from .models import OutboxMessage
+
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_MAX_ATTEMPTS = 8
+# Backoff after the n-th failure: RETRY_BASE * 2**(n-1), capped
+RETRY_BASE = timedelta(seconds=5)
+RETRY_CAP = timedelta(minutes=30)
+# How long a claimed batch stays with its drainer before others may resend it
+OUTBOX_LEASE = timedelta(minutes=5)
+
+
+def _drain_on_commit():
+    # Dev convenience: without a beat/worker running nothing would be sent
+    if getattr(settings, 'OUTBOX_DRAIN_ON_COMMIT', False):
+        transaction.on_commit(drain)
+
+
+def enqueue_task(task, *args, **kwargs):
+    """Record `task.delay(*args, **kwargs)` to run once the current transaction commits."""
+    message = OutboxMessage.objects.create(
+        kind='task', payload={'task': task.name, 'args': list(args), 'kwargs': kwargs},
+    )
+    _drain_on_commit()
+    return message
+
+
+def enqueue_broadcast(groups, event):
+    """Record a channel-layer group_send(group, event) to one group or a list of them."""
+    return enqueue_broadcasts([(groups, event)])
+
+
+def enqueue_broadcasts(messages):
+    """Several broadcasts as one INSERT; `messages` is an iterable of (group(s), event)."""
+    rows = OutboxMessage.objects.bulk_create([
+        OutboxMessage(kind='broadcast', payload={
+            'groups': [groups] if isinstance(groups, str) else list(groups), 'event': event,
+        })
+        for groups, event in messages
+    ])
+    if rows:
+        _drain_on_commit()
+    return rows
+
+
+def enqueue_emails(messages):
+    """Queue EmailMessages for batched delivery, as one INSERT."""
+    from .mailer import email_payload
+    rows = OutboxMessage.objects.bulk_create([
+        OutboxMessage(kind='email', payload=email_payload(message)) for message in messages
+    ])
+    if rows:
+        _drain_on_commit()
+    return rows
+
+
+def _send_task(payload):
+    from celery import current_app
+    current_app.tasks[payload['task']].apply_async(payload['args'], payload['kwargs'])
+
+
+def _backoff(attempts):
+    return min(RETRY_BASE * 2 ** (attempts - 1), RETRY_CAP)
+
+
+def _dispatch(batch):
+    """Send a locked batch; returns (sent ids, {id: error})."""
+    sent, errors = [], {}
+    broadcasts, emails = [], []
+    for message in batch:
+        if message.kind == 'broadcast':
+            broadcasts.append(message)
+            continue
+        if message.kind == 'email':
+            emails.append(message)
+            continue
+        try:
+            _send_task(message.payload)
+            sent.append(message.id)
+        except Exception as e:
+            errors[message.id] = repr(e)
+
+    if broadcasts:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            # Nobody could be listening; nothing to retry
+            sent.extend(m.id for m in broadcasts)
+        else:
+            async def send_all():
+                # One event loop for the whole batch. Messages go out in order;
+                # the groups of one message are sent to concurrently.
+                for message in broadcasts:
+                    groups = message.payload.get('groups') or [message.payload['group']]
+                    try:
+                        # Encoded here once for every group and socket (core.frames)
+                        event = pack_event(message.payload['event'])
+                    except Exception as e:
+                        errors[message.id] = repr(e)
+                        continue
+                    results = await asyncio.gather(
+                        *(channel_layer.group_send(group, event) for group in groups),
+                        return_exceptions=True,
+                    )
+                    failures = [r for r in results if isinstance(r, BaseException)]
+                    if failures:
+                        errors[message.id] = repr(failures[0])
+                    else:
+                        sent.append(message.id)
+            async_to_sync(send_all)()
+
+    if emails:
+        from .mailer import deliver, email_from_payload
+        delivered, failed = deliver([email_from_payload(m.payload) for m in emails])
+        sent.extend(emails[i].id for i in delivered)
+        errors.update((emails[i].id, error) for i, error in failed.items())
+    return sent, errors
+
+
+def _claim(batch_size):
+    """
+    Lease the next due batch: its rows become 'sending' until the returned
+    deadline, when another drainer may take them over.
+    """
+    now = timezone.now()
+    lease_until = now + getattr(settings, 'OUTBOX_LEASE', OUTBOX_LEASE)
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status__in=('pending', 'sending'), available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if batch:
+            OutboxMessage.objects.filter(pk__in=[m.id for m in batch]).update(
+                status='sending', available_at=lease_until,
+            )
+    return batch, lease_until
+
+
+def _record(batch, lease_until, sent, errors, max_attempts):
+    """Store the outcome of a batch, unless its lease ran out and another drainer took it."""
+    now = timezone.now()
+    # available_at still at our deadline means the lease is still ours
+    leased = OutboxMessage.objects.filter(status='sending', available_at=lease_until)
+    with transaction.atomic():
+        if sent:
+            leased.filter(pk__in=sent).update(status='sent', sent_at=now)
+        for message in batch:
+            if message.id not in errors:
+                continue
+            attempts = message.attempts + 1
+            leased.filter(pk=message.id).update(
+                attempts=attempts,
+                last_error=errors[message.id][:2000],
+                available_at=now + _backoff(attempts),
+                status='failed' if attempts >= max_attempts else 'pending',
+            )
+
+
+def drain(batch_size=None):
+    """Send everything that is due; returns the number of messages sent."""
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', OUTBOX_BATCH_SIZE)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', OUTBOX_MAX_ATTEMPTS)
+    total = 0
+
+    while True:
+        batch, lease_until = _claim(batch_size)
+        if not batch:
+            return total
+
+        # No transaction or row lock is held while talking to the broker,
+        # the channel layer or SMTP
+        sent, errors = _dispatch(batch)
+        _record(batch, lease_until, sent, errors, max_attempts)
+
+        total += len(sent)
+        if len(batch) < batch_size:
+            return total
+
+
+def prune(older_than=None):
+    """Delete sent messages older than OUTBOX_RETENTION_DAYS; failed rows stay for inspection."""
+    older_than = older_than or timedelta(days=getattr(settings, 'OUTBOX_RETENTION_DAYS', 7))
+    deleted, _ = OutboxMessage.objects.filter(
+        status='sent', created_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
@@ -0,0 +1,256 @@
+# core/pagination.py
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a (column, id) ordering.
+
+    Pages are found with a WHERE on the last row seen instead of an OFFSET,
+    so every page is one index range scan no matter how deep the client is,
+    and rows inserted at the head don't shift the pages already handed out.
+
+    The ordering is `ordering` unless the view supplies `keyset_ordering`
+    (e.g. from ?sort=); both columns must sort the same direction. Cursors
+    remember the ordering they were issued for.
+
+    It is opt-in: unless the request carries ?cursor= or ?page_size= the
+    queryset is returned unpaginated, so existing list callers keep working.
+    Endpoints without such callers set opt_in = False and always page.
+    """
+    ordering = ('-created_at', '-id')
+    opt_in = True
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        if not self.opt_in:
+            return True
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, view):
+        return getattr(view, 'keyset_ordering', None) or self.ordering
+
+    @property
+    def keyset(self):
+        return tuple(field.lstrip('-') for field in self.active_ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.active_ordering = self.get_ordering(view)
+        position, reverse = self.decode_cursor(request, queryset)
+
+        column, pk = self.keyset
+        descending = self.active_ordering[0].startswith('-')
+        if reverse:
+            descending = not descending
+
+        if descending:
+            queryset = queryset.order_by(f'-{column}', f'-{pk}')
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(**{f'{column}__lte': position[0]}) &
+                    (Q(**{f'{column}__lt': position[0]}) | Q(**{f'{pk}__lt': position[1]}))
+                )
+        else:
+            queryset = queryset.order_by(column, pk)
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(**{f'{column}__gte': position[0]}) &
+                    (Q(**{f'{column}__gt': position[0]}) | Q(**{f'{pk}__gt': position[1]}))
+                )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # Cursor encoding
+    # ──────────────────────────────────────────────────────────────
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def position_for(self, obj):
+        values = []
+        for field in self.keyset:
+            value = getattr(obj, field)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            values.append(value)
+        return values
+
+    def encode_cursor(self, obj, reverse):
+        token = json.dumps(
+            {'p': self.position_for(obj), 'r': int(reverse), 'o': ','.join(self.active_ordering)},
+            separators=(',', ':'),
+        )
+        encoded = base64.urlsafe_b64encode(token.encode()).decode()
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def keyset_field(self, queryset, name):
+        """The model field (or annotation's output field) a keyset column compares against."""
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset.query.annotations[name].output_field
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            token = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = token['p']
+            reverse = bool(token.get('r', 0))
+            if len(position) != len(self.keyset):
+                raise ValueError
+            # A cursor from another ?sort= points nowhere meaningful
+            if token.get('o', ','.join(self.ordering)) != ','.join(self.active_ordering):
+                raise ValueError
+            # The values go straight into a WHERE: a tampered one must not reach the database
+            position = [
+                self.keyset_field(queryset, name).to_python(value)
+                for name, value in zip(self.keyset, position)
+            ]
+            if None in position:
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class TaskCursorPagination(KeysetPagination):
+    """Newest tasks first by default; follows the view's ?sort= when set."""
+    ordering = ('-created_at', '-id')
+
+
+class UserTaskPagination(TaskCursorPagination):
+    """A user's tasks (/api/admin/users/<id>/tasks/): always paged."""
+    opt_in = False
+
+
+class UserCursorPagination(KeysetPagination):
+    """Newest users first, keyed on (date_joined, id)."""
+    ordering = ('-date_joined', '-id')
+
+
+class NotificationCursorPagination(KeysetPagination):
+    """Newest notifications first, keyed on (created_at, id)."""
+    ordering = ('-created_at', '-id')
+
+
+class RankedPagination(BasePagination):
+    """
+    Limit/offset pages for ranked results (search), where a keyset doesn't
+    apply. Skips COUNT(*): one extra row is fetched to know if there's more.
+    """
+    default_limit = 20
+    max_limit = 100
+    limit_query_param = 'limit'
+    offset_query_param = 'offset'
+
+    def _int_param(self, request, name, default, maximum=None):
+        try:
+            value = int(request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            return default
+        value = max(0, value)
+        return min(value, maximum) if maximum is not None else value
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self._int_param(request, self.limit_query_param, self.default_limit, self.max_limit) or self.default_limit
+        self.offset = self._int_param(request, self.offset_query_param, 0)
+
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = replace_query_param(self.base_url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        url = replace_query_param(self.base_url, self.limit_query_param, self.limit)
+        previous = max(0, self.offset - self.limit)
+        if previous == 0:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.offset_query_param, previous)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
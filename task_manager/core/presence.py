@@ -0,0 +1,83 @@
+# core/presence.py
+"""
+Typing indicators, throttled per connection before they reach the channel
+layer.
+
+A client may send a typing frame on every keystroke; TypingThrottle turns
+that into at most one group message per TYPING_MIN_INTERVAL:
+
+- repeats of the current state are dropped, except a "still typing"
+  refresh every TYPING_REFRESH seconds;
+- a change inside the interval is held back and the latest state goes
+  out when the interval is over (so a quick start/stop never leaves a
+  stale "typing" behind);
+- without a typing frame for TYPING_TIMEOUT seconds the state expires
+  to not typing, as it does when the socket closes.
+
+Frames carry `expires_in` so clients can expire a lost "typing" themselves.
+"""
+import asyncio
+
+from django.conf import settings
+
+TYPING_MIN_INTERVAL = 0.5  # seconds between group messages per connection
+TYPING_REFRESH = 3.0
+TYPING_TIMEOUT = 5.0
+
+
+def typing_timeout():
+    return getattr(settings, 'TYPING_TIMEOUT', TYPING_TIMEOUT)
+
+
+class TypingThrottle:
+    def __init__(self, publish):
+        # publish(is_typing) -> awaitable doing the group_send
+        self.publish = publish
+        self.min_interval = getattr(settings, 'TYPING_MIN_INTERVAL', TYPING_MIN_INTERVAL)
+        self.refresh = getattr(settings, 'TYPING_REFRESH', TYPING_REFRESH)
+        self.timeout = typing_timeout()
+        self.wanted = False
+        self.sent = False
+        self.sent_at = None
+        self._pending = None
+        self._expiry = None
+
+    def update(self, is_typing):
+        self.wanted = bool(is_typing)
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+        if self.wanted:
+            self._expiry = asyncio.get_running_loop().call_later(self.timeout, self._expire)
+        self._maybe_publish()
+
+    def _expire(self):
+        self._expiry = None
+        self.wanted = False
+        self._maybe_publish()
+
+    def _maybe_publish(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.wanted == self.sent:
+            if not self.wanted or (self.sent_at is not None and now - self.sent_at < self.refresh):
+                return
+        if self.sent_at is not None and now - self.sent_at < self.min_interval:
+            if self._pending is None:
+                self._pending = loop.call_later(self.sent_at + self.min_interval - now, self._release)
+            return
+        self.sent, self.sent_at = self.wanted, now
+        asyncio.ensure_future(self.publish(self.wanted))
+
+    def _release(self):
+        self._pending = None
+        self._maybe_publish()
+
+    async def close(self):
+        for handle in (self._pending, self._expiry):
+            if handle is not None:
+                handle.cancel()
+        self._pending = self._expiry = None
+        if self.sent:
+            self.sent = False
+            await self.publish(False)
@@ -0,0 +1,102 @@
+# core/reminders.py
+"""
+Deadline reminders in tiers (settings.DEADLINE_REMINDER_TIERS, hours,
+e.g. 24, 6, 1).
+
+Task.deadline_reminders_sent counts the tiers already fired for the current
+deadline, so a run only picks tasks whose next tier is due and is safe to
+repeat every minute. A task that skips tiers (created 30 minutes before its
+deadline, or a run missed) gets one reminder for the tightest tier it is in,
+not one per tier. Moving the deadline resets the count; any other Task.save
+leaves it out of the UPDATE, so a stale instance can't rewind it.
+
+Due tasks come from one range scan of the partial open-deadline index;
+reminders are written with bulk_create and the counters with one UPDATE per
+tier.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification, Task
+from .notifications import notifications_created
+
+# Statuses still being worked on (a subset of OPEN_TASK_STATUSES, so the
+# partial index core_task_open_deadline_idx applies)
+REMINDER_STATUSES = ('submitted', 'budget_negotiation', 'in_progress', 'revision_requested')
+REMINDER_BATCH_SIZE = 500
+
+
+def reminder_tiers():
+    """Tier offsets, widest first."""
+    hours = getattr(settings, 'DEADLINE_REMINDER_TIERS', (24, 6, 1))
+    return [timedelta(hours=h) for h in sorted(hours, reverse=True)]
+
+
+def tiers_reached(remaining, tiers):
+    return sum(1 for tier in tiers if remaining <= tier)
+
+
+def _describe(tier):
+    hours = tier.total_seconds() / 3600
+    if hours < 1:
+        return f"{int(tier.total_seconds() // 60)} minutes"
+    hours = int(hours) if hours == int(hours) else round(hours, 1)
+    return "1 hour" if hours == 1 else f"{hours} hours"
+
+
+def due_tasks(now, tiers):
+    """Tasks whose next unfired tier has come up."""
+    next_tier_due = Q()
+    for fired, tier in enumerate(tiers):
+        next_tier_due |= Q(deadline_reminders_sent=fired, deadline__lte=now + tier)
+    return (
+        Task.objects.filter(status__in=REMINDER_STATUSES, deadline__gt=now, deadline__lte=now + tiers[0])
+        .filter(next_tier_due)
+        .order_by('deadline', 'id')
+        .only('id', 'title', 'deadline', 'deadline_reminders_sent', 'assigned_admin_id', 'client_id')
+    )
+
+
+def send_due_reminders(now=None, batch_size=REMINDER_BATCH_SIZE):
+    """Fire every due reminder tier; returns the number of reminders written."""
+    tiers = reminder_tiers()
+    if not tiers:
+        return 0
+    now = now or timezone.now()
+    sent = 0
+
+    while True:
+        with transaction.atomic():
+            # Concurrent runs (overlapping beat ticks) skip each other's rows
+            batch = list(due_tasks(now, tiers).select_for_update(skip_locked=True)[:batch_size])
+            if not batch:
+                return sent
+
+            by_level = defaultdict(list)
+            reminders = []
+            for task in batch:
+                level = tiers_reached(task.deadline - now, tiers)
+                by_level[level].append(task.id)
+                reminders.append(Notification(
+                    # Same recipient as before tiers existed: the assignee, else the client
+                    user_id=task.assigned_admin_id or task.client_id,
+                    notification_type='deadline_approaching',
+                    title="Deadline Approaching",
+                    message=f"Task '{task.title}' is due in less than {_describe(tiers[level - 1])}.",
+                    task_id=task.id,
+                ))
+
+            # Plain UPDATEs: the counter isn't part of the serialized task, so no version bump
+            for level, ids in by_level.items():
+                Task.objects.filter(pk__in=ids).update(deadline_reminders_sent=level)
+            created = Notification.objects.bulk_create(reminders)
+            transaction.on_commit(lambda created=created: notifications_created(created))
+
+        sent += len(batch)
+        if len(batch) < batch_size:
+            return sent
@@ -0,0 +1,92 @@
+# core/search.py
+"""
+Task search for /api/tasks/search/.
+
+On PostgreSQL this is full-text search over a weighted tsvector of
+title (A), subject (B) and description (C), matched against an expression
+GIN index of the very same expression (migration 0020), plus prefix
+matching on task_id (served by the varchar_pattern_ops index Django
+creates for the unique column). Every search term
+is prefix-matched (`term:*`) so results show up while the admin is typing.
+
+Other backends (SQLite in development and tests) get a LIKE fallback with
+a simple field-weighted rank, so the endpoint behaves the same everywhere.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+
+SEARCH_CONFIG = 'english'
+MAX_TERMS = 8
+
+
+def search_terms(q):
+    return re.findall(r'\w+', q or '')[:MAX_TERMS]
+
+
+def task_search_vector():
+    """Must stay identical to the indexed expression in migration 0020."""
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('subject', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def _task_id_prefix(terms, lookup):
+    # Only a lone term can be a task id ("TSK00", "tsk0042")
+    if len(terms) != 1:
+        return None
+    return Q(**{f'task_id__{lookup}': terms[0].upper()})
+
+
+def _postgres_search(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+    vector = task_search_vector()
+
+    match = Q(document=query)
+    rank = SearchRank(vector, query)
+    id_prefix = _task_id_prefix(terms, 'startswith')
+    if id_prefix is not None:
+        match |= id_prefix
+        rank = rank + Case(When(id_prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+
+    return queryset.alias(document=vector).filter(match).annotate(rank=rank)
+
+
+def _fallback_search(queryset, terms):
+    match = Q()
+    for term in terms:
+        match &= Q(title__icontains=term) | Q(subject__icontains=term) | Q(description__icontains=term)
+
+    first = terms[0]
+    rank = Case(
+        When(title__icontains=first, then=Value(0.6)),
+        When(subject__icontains=first, then=Value(0.4)),
+        default=Value(0.2),
+        output_field=FloatField(),
+    )
+    id_prefix = _task_id_prefix(terms, 'istartswith')
+    if id_prefix is not None:
+        match |= id_prefix
+        rank = rank + Case(When(id_prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+
+    return queryset.filter(match).annotate(rank=rank)
+
+
+def search_tasks(queryset, q):
+    """Filter `queryset` to tasks matching `q`, best matches first."""
+    terms = search_terms(q)
+    if not terms:
+        return queryset.none()
+
+    if connections[queryset.db].vendor == 'postgresql':
+        queryset = _postgres_search(queryset, terms)
+    else:
+        queryset = _fallback_search(queryset, terms)
+    return queryset.order_by('-rank', '-created_at', '-id')
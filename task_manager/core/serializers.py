@@ -4,6 +4,7 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.utils import timezone
 import pytz
 
+from .fieldsets import SparseFieldsetMixin
 from .models import (
     UserProfile, TaskCategory, Task, ChatMessage,
     Notification, Timezone, TaskFile, Revision, BudgetProposal
@@ -123,9 +124,11 @@ class BudgetProposalSerializer(serializers.ModelSerializer):
 # serializers.py
 from rest_framework import serializers
 from .models import ChatMessage
+from .chat_read import read_by_peer, read_positions
 
 class ChatMessageSerializer(serializers.ModelSerializer):
     sender_role = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     file_url = serializers.SerializerMethodField()   # ← NOT a model field
     file_name = serializers.CharField(read_only=True)  # ← We set this manually in consumer
 
@@ -135,13 +138,26 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         model = ChatMessage
         fields = [
             'id', 'message', 'file', 'file_name', 'file_url',
-            'is_read', 'created_at', 'sender', 'sender_role'
+            'is_read', 'created_at', 'sender', 'sender_role', 'client_id'
         ]
-        read_only_fields = ['sender', 'sender_role', 'file_url', 'created_at', 'is_read', 'file_name']
+        read_only_fields = ['sender', 'sender_role', 'file_url', 'created_at', 'file_name', 'client_id']
 
     def get_sender_role(self, obj):
         return getattr(obj.sender.profile, 'role', 'client') if hasattr(obj.sender, 'profile') else 'client'
 
+    def get_is_read(self, obj):
+        # Read once the other side's cursor has passed it (core.chat_read)
+        if obj.pk is None:
+            return False
+        task = obj.task if ChatMessage.task.is_cached(obj) else None
+        if task is not None and hasattr(task, 'staff_read_id'):
+            # Annotated by the task query plan when chat is rendered under a task
+            return read_by_peer(obj, (task.client_id, task.client_read_id, task.staff_read_id))
+        memo = self.context.setdefault('chat_read_positions', {})
+        if obj.task_id not in memo:
+            memo[obj.task_id] = read_positions(obj.task_id)
+        return memo[obj.task_id] is not None and read_by_peer(obj, memo[obj.task_id])
+
     def get_file_url(self, obj):
         if obj.file and hasattr(obj.file, 'url'):
             request = self.context.get('request')
@@ -151,7 +167,130 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         return None
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Just enough of a user to label a task row — no profile join."""
+    full_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'full_name']
+
+    def get_full_name(self, obj):
+        return obj.get_full_name()
+
+
+USER_SUMMARY_COLUMNS = ('id', 'username', 'first_name', 'last_name')
+
+
+def days_until_deadline(task):
+    if task.deadline:
+        delta = task.deadline - timezone.now()
+        return max(0, delta.days)
+    return None
+
+
+def is_overdue(task):
+    if task.deadline and task.status not in ['completed', 'cancelled', 'rejected']:
+        return timezone.now() > task.deadline
+    return False
+
+
+# Move with the clock, not with Task.version: core.cache recomputes them per call
+CLOCK_FIELDS = {'days_until_deadline': days_until_deadline, 'is_overdue': is_overdue}
+
+
+def _with_read_positions(queryset, context):
+    return queryset.with_read_positions()
+
+
+def _with_unread_counts(queryset, context):
+    request = context.get('request')
+    if not request or not request.user.is_authenticated:
+        return queryset
+    return queryset.with_unread_counts(request.user)
+
+
+class TaskSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Compact task row for list views and notifications.
+    No chat, files, revisions or profiles, so the cost scales with the
+    number of tasks and not with how busy each one is.
+    Supports ?fields= / ?expand= (see core.fieldsets).
+    """
+    expandable_fields = {
+        'client': lambda: UserSerializer(read_only=True),
+        'assigned_admin': lambda: UserSerializer(read_only=True, allow_null=True),
+        'timezone_obj': lambda: TimezoneSerializer(source='timezone', read_only=True),
+        'files': lambda: TaskFileSerializer(many=True, read_only=True),
+        'revisions': lambda: RevisionSerializer(many=True, read_only=True),
+        'chat': lambda: ChatMessageSerializer(source='messages', many=True, read_only=True),
+    }
+    query_plan = {
+        'client': {'select': ['client'], 'only': ['client'] + [f'client__{c}' for c in USER_SUMMARY_COLUMNS]},
+        'assigned_admin': {
+            'select': ['assigned_admin'],
+            'only': ['assigned_admin'] + [f'assigned_admin__{c}' for c in USER_SUMMARY_COLUMNS],
+        },
+        'category': {'select': ['category'], 'only': ['category']},
+        'unread_messages': {'only': ['client'], 'apply': _with_unread_counts},
+        'days_until_deadline': {'only': ['deadline']},
+        'is_overdue': {'only': ['deadline', 'status']},
+    }
+    expanded_query_plan = {
+        'client': {'select': ['client__profile'], 'only': ['client']},
+        'assigned_admin': {'select': ['assigned_admin__profile'], 'only': ['assigned_admin']},
+        'timezone_obj': {'select': ['timezone'], 'only': ['timezone']},
+        'files': {'prefetch': ['files__uploaded_by']},
+        'revisions': {'prefetch': ['revisions__requested_by']},
+        'chat': {'prefetch': ['messages__sender__profile'], 'only': ['client'], 'apply': _with_read_positions},
+    }
+
+    client = UserSummarySerializer(read_only=True)
+    assigned_admin = UserSummarySerializer(read_only=True, allow_null=True)
+    category = TaskCategorySerializer(read_only=True)
+
+    unread_messages = serializers.SerializerMethodField()
+    days_until_deadline = serializers.SerializerMethodField()
+    is_overdue = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'task_id', 'client', 'category',
+            'title', 'description', 'subject', 'education_level', 'deadline',
+            'status', 'assigned_admin', 'priority', 'progress',
+            'budget', 'proposed_budget', 'admin_counter_budget', 'negotiation_status',
+            'unread_messages', 'withdrawal_deadline', 'can_withdraw_free',
+            'accepted_at', 'completed_at', 'days_until_deadline', 'is_overdue',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_unread_messages(self, obj):
+        # Annotated by Task.objects.with_unread_counts() on list/detail querysets
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
+        request = self.context.get('request')
+        if not request or not request.user or not request.user.is_authenticated:
+            return 0
+        return obj.unread_messages_count(request.user)
+
+    def get_days_until_deadline(self, obj):
+        return days_until_deadline(obj)
+
+    def get_is_overdue(self, obj):
+        return is_overdue(obj)
+
+
+class TaskSerializer(TaskSummarySerializer):
+    query_plan = {
+        **TaskSummarySerializer.query_plan,
+        **TaskSummarySerializer.expanded_query_plan,
+        'file_url': {'only': ['file']},
+        'response_file_url': {'only': ['file', 'response_file']},
+        'revision_file_url': {'only': ['revision_file']},
+    }
+
     client = UserSerializer(read_only=True)
     assigned_admin = UserSerializer(read_only=True, allow_null=True)
     category = TaskCategorySerializer(read_only=True)
@@ -173,10 +312,6 @@ class TaskSerializer(serializers.ModelSerializer):
     response_file_url = serializers.SerializerMethodField()
     revision_file_url = serializers.SerializerMethodField()
 
-    unread_messages = serializers.SerializerMethodField()
-    days_until_deadline = serializers.SerializerMethodField()
-    is_overdue = serializers.SerializerMethodField()
-
     class Meta:
         model = Task
         fields = [
@@ -215,27 +350,6 @@ class TaskSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.revision_file.url) if request else obj.revision_file.url
         return None
 
-    def get_unread_messages(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user:
-            return 0
-        user_role = getattr(request.user.profile, 'role', 'client') if hasattr(request.user, 'profile') else 'client'
-        if user_role == 'client':
-            return obj.messages.filter(is_read=False, sender__profile__role='admin').count()
-        else:
-            return obj.messages.filter(is_read=False, sender=obj.client).count()
-
-    def get_days_until_deadline(self, obj):
-        if obj.deadline:
-            delta = obj.deadline - timezone.now()
-            return max(0, delta.days)
-        return None
-
-    def get_is_overdue(self, obj):
-        if obj.deadline and obj.status not in ['completed', 'cancelled', 'rejected']:
-            return timezone.now() > obj.deadline
-        return False
-
     def create(self, validated_data):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
@@ -280,8 +394,17 @@ class TaskSerializer(serializers.ModelSerializer):
         return value
 
 
+class TaskRefSerializer(serializers.ModelSerializer):
+    """Just enough of a task to label and link it; see ?include=tasks for more."""
+    class Meta:
+        model = Task
+        fields = ['id', 'task_id', 'title', 'status']
+        read_only_fields = fields
+
+TASK_REF_COLUMNS = ['task__' + name for name in TaskRefSerializer.Meta.fields]
+
 class NotificationSerializer(serializers.ModelSerializer):
-    task = TaskSerializer(read_only=True)
+    task = TaskRefSerializer(read_only=True)
 
     class Meta:
         model = Notification
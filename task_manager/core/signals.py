@@ -37,4 +37,83 @@
 # @receiver(post_save, sender=ChatMessage)
 # def message_sent(sender, instance, created, **kwargs):
 #     if created:
-#         notify_new_message.delay(instance.task.id, instance.id)
\ No newline at end of file
+#         notify_new_message.delay(instance.task.id, instance.id)
+
+# ──────────────────────────────────────────────────────────────
+# Task version bumps (serialized-task cache invalidation)
+# ──────────────────────────────────────────────────────────────
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import list_versions
+from .models import Task, TaskCategory, TaskFile, Revision, ChatMessage, TaskTombstone, Notification
+from .notifications import adjust_unread
+from .digests import schedule_digest
+
+
+def bump_task_version(instance):
+    """A child row of a task changed, so its serialized form did too."""
+    # updated_at moves as well so delta sync (/api/tasks/changes/) picks it up
+    Task.objects.filter(pk=instance.task_id).update(version=F('version') + 1, updated_at=timezone.now())
+    # Keep an in-memory task the caller is still holding in step (with the
+    # stored value: other writers may have bumped it too)
+    if type(instance).task.is_cached(instance):
+        instance.task.refresh_from_db(fields=['version'])
+        client_id = instance.task.client_id
+    else:
+        client_id = Task.objects.filter(pk=instance.task_id).values_list('client_id', flat=True).first()
+    if client_id is not None:
+        list_versions.bump_tasks(client_id)
+
+
+@receiver(post_save, sender=TaskFile)
+@receiver(post_save, sender=Revision)
+@receiver(post_save, sender=ChatMessage)
+@receiver(post_delete, sender=TaskFile)
+@receiver(post_delete, sender=Revision)
+@receiver(post_delete, sender=ChatMessage)
+def task_child_changed(sender, instance, **kwargs):
+    bump_task_version(instance)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    list_versions.bump_tasks(instance.client_id)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    TaskTombstone.record(instance, 'deleted')
+    list_versions.bump_tasks(instance.client_id)
+
+
+@receiver(post_save, sender=TaskCategory)
+@receiver(post_delete, sender=TaskCategory)
+def category_changed(sender, instance, **kwargs):
+    list_versions.bump(list_versions.CATEGORIES)
+
+
+@receiver(post_save, sender=ChatMessage)
+def chat_message_created(sender, instance, created, **kwargs):
+    # Chat emails go out as coalesced digests (core/digests.py)
+    if created:
+        schedule_digest(instance)
+
+
+# ──────────────────────────────────────────────────────────────
+# Unread notification counter (core/notifications.py)
+# ──────────────────────────────────────────────────────────────
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.user_id, 1)
+    list_versions.bump(list_versions.notifications(instance.user_id))
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.user_id, -1)
+    list_versions.bump(list_versions.notifications(instance.user_id))
@@ -0,0 +1,103 @@
+# core/sync.py
+"""
+Delta sync for reconnecting clients: tasks changed since a cursor.
+
+The cursor is an opaque token holding the (updated_at, id) of the last task
+row handed out and the id of the last tombstone. Both are walked in index
+order, so catching up costs what changed, not the size of the table.
+
+A row whose transaction commits late can carry an updated_at slightly older
+than rows already seen. The cursor therefore never advances past
+`now - SYNC_SETTLE_SECONDS`: very recent rows may be sent twice (clients
+apply them idempotently by `version`), but none are skipped. Tombstones
+get the same treatment: a late delete can commit with a lower id than
+tombstones already seen, so the tombstone cursor stops before the first one
+created inside the settle window, and those are sent again next time.
+"""
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import TaskTombstone
+
+SYNC_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(updated_at, pk, tombstone_id):
+    token = {'t': updated_at.isoformat() if updated_at else None, 'i': pk, 'd': tombstone_id}
+    return base64.urlsafe_b64encode(json.dumps(token, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(raw):
+    if not raw:
+        return None, 0, 0
+    try:
+        token = json.loads(base64.urlsafe_b64decode(raw.encode()).decode())
+        updated_at = parse_datetime(token['t']) if token['t'] else None
+        return updated_at, int(token['i']), int(token['d'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def changes_since(tasks, tombstones, raw_cursor, limit=SYNC_PAGE_SIZE):
+    """
+    `tasks` / `tombstones` are the caller's visibility-filtered querysets.
+    Returns (changed task rows, tombstones, next cursor, has_more).
+    """
+    updated_at, pk, tombstone_id = decode_cursor(raw_cursor)
+    settle = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 5))
+
+    if updated_at is not None:
+        tasks = tasks.filter(
+            Q(updated_at__gte=updated_at) & (Q(updated_at__gt=updated_at) | Q(id__gt=pk))
+        )
+    rows = list(tasks.order_by('updated_at', 'id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    removed = list(tombstones.filter(id__gt=tombstone_id).order_by('id')[:limit])
+    next_tombstone = tombstone_id
+    for tombstone in removed:
+        if tombstone.created_at > settle:
+            # Lower ids may still be committing: re-read from here next time
+            break
+        next_tombstone = tombstone.id
+    if len(removed) == limit and next_tombstone == removed[-1].id:
+        has_more = True
+
+    next_updated_at, next_pk = updated_at, pk
+    if rows:
+        last = rows[-1]
+        next_updated_at, next_pk = last.updated_at, last.id
+        if not has_more and next_updated_at > settle:
+            # Re-scan the settle window next time instead of trusting it now
+            next_updated_at, next_pk = settle, 0
+            if updated_at is not None and updated_at > settle:
+                next_updated_at, next_pk = updated_at, pk
+
+    return rows, removed, encode_cursor(next_updated_at, next_pk, next_tombstone), has_more
+
+
+def visible_tombstones(user):
+    profile = getattr(user, 'profile', None)
+    if profile and profile.role == 'admin':
+        return TaskTombstone.objects.all()
+    return TaskTombstone.objects.filter(client_pk=user.pk)
+
+
+def cursor_expired(raw_cursor):
+    """True when tombstones the cursor still needs may already have been pruned."""
+    updated_at, _, _ = decode_cursor(raw_cursor)
+    if updated_at is None:
+        return False
+    retention = timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+    return updated_at < timezone.now() - retention
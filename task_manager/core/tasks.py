@@ -2,7 +2,9 @@
 from celery import shared_task
 from django.contrib.auth.models import User
 from .models import Notification, Task
-from .email_service import send_new_task_notification, send_task_status_update, send_new_message_notification
+from .email_service import (
+    send_new_task_notification, send_task_status_update, build_task_status_email,
+)
 
 @shared_task
 def create_notification(user_id, title, message, task_id=None, notification_type='system'):
@@ -20,24 +22,22 @@ def create_notification(user_id, title, message, task_id=None, notification_type
 
 @shared_task
 def notify_new_task(task_id):
-    """Send email notifications for new task"""
+    """Email the admins about a new task and give each an in-app notification (one job per task)"""
+    from .notifications import admin_recipient_ids, fan_out
+
     try:
-        task = Task.objects.get(id=task_id)
-        send_new_task_notification(task)
-        
-        # Also create in-app notifications for admins
-        from .models import UserProfile
-        admins = UserProfile.objects.filter(role='admin', user__is_active=True)
-        for admin in admins:
-            create_notification.delay(
-                admin.user.id,
-                "New Task Submitted",
-                f"New task '{task.title}' has been submitted and requires review.",
-                task.id,
-                'task_created'
-            )
+        task = Task.objects.select_related('client').get(id=task_id)
     except Task.DoesNotExist:
-        pass
+        return
+    send_new_task_notification(task)
+
+    fan_out(
+        admin_recipient_ids(),
+        "New Task Submitted",
+        f"New task '{task.title}' has been submitted and requires review.",
+        task.id,
+        'task_created',
+    )
 
 @shared_task
 def notify_task_status_update(task_id, update_message):
@@ -48,44 +48,75 @@ def notify_task_status_update(task_id, update_message):
     except Task.DoesNotExist:
         pass
 
+@shared_task
+def notify_tasks_status_update(task_ids, update_message):
+    """Bulk form of notify_task_status_update; `update_message` may use {title}"""
+    from .outbox import enqueue_emails
+
+    tasks = Task.objects.filter(id__in=task_ids).select_related('client', 'assigned_admin')
+    enqueue_emails([
+        build_task_status_email(task, task.client, update_message.format(title=task.title))
+        for task in tasks
+    ])
+
+@shared_task
+def create_task_notifications(task_ids, title, message, notification_type='system'):
+    """One notification per task for its client, in a single INSERT; `message` may use {title}"""
+    from .notifications import notifications_created
+
+    tasks = Task.objects.filter(id__in=task_ids).only('id', 'client_id', 'title')
+    created = Notification.objects.bulk_create([
+        Notification(
+            user_id=task.client_id,
+            notification_type=notification_type,
+            title=title,
+            message=message.format(title=task.title),
+            task=task,
+        )
+        for task in tasks
+    ])
+    notifications_created(created)
+
 @shared_task
 def notify_new_message(task_id, message_id):
-    """Send email notification for new chat message"""
+    """Chat emails are digests now: arm the recipient's digest (saving a message already does)"""
     from .models import ChatMessage
-    try:
-        message = ChatMessage.objects.get(id=message_id)
-        task = Task.objects.get(id=task_id)
-        
-        # Determine recipient (opposite of sender)
-        if message.sender == task.client:
-            recipient = task.assigned_admin
-        else:
-            recipient = task.client
-            
-        if recipient:
-            send_new_message_notification(task, message, recipient)
-    except (ChatMessage.DoesNotExist, Task.DoesNotExist):
-        pass
+    from .digests import schedule_digest
+    message = ChatMessage.objects.filter(id=message_id, task_id=task_id).first()
+    if message is not None:
+        schedule_digest(message)
 
 @shared_task
 def check_deadlines():
-    """Check for approaching deadlines and send notifications"""
+    """Send the deadline reminder tiers that have come due (beat: every minute)"""
+    from .reminders import send_due_reminders
+    return send_due_reminders()
+
+@shared_task
+def prune_task_tombstones():
+    """Drop tombstones older than TASK_TOMBSTONE_RETENTION_DAYS (delta-sync cursors that old must reset)"""
+    from django.conf import settings
     from django.utils import timezone
     from datetime import timedelta
-    
-    # Tasks with deadlines in the next 24 hours
-    approaching_deadline = timezone.now() + timedelta(hours=24)
-    tasks = Task.objects.filter(
-        deadline__lte=approaching_deadline,
-        deadline__gt=timezone.now(),
-        status__in=['in_progress', 'submitted']
-    )
-    
-    for task in tasks:
-        create_notification.delay(
-            task.assigned_admin.id if task.assigned_admin else task.client.id,
-            "Deadline Approaching",
-            f"Task '{task.title}' is due in less than 24 hours.",
-            task.id,
-            'deadline_approaching'
-        )
\ No newline at end of file
+    from .models import TaskTombstone
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+    TaskTombstone.objects.filter(created_at__lt=cutoff).delete()
+
+@shared_task
+def send_chat_digests():
+    """Email the chat digests that have come due (beat: every minute)"""
+    from .digests import send_due_digests
+    return send_due_digests()
+
+@shared_task
+def drain_outbox():
+    """Send pending outbox messages (beat: every few seconds)"""
+    from .outbox import drain
+    return drain()
+
+@shared_task
+def prune_outbox():
+    """Drop sent outbox messages older than OUTBOX_RETENTION_DAYS"""
+    from .outbox import prune
+    return prune()
@@ -1,3 +1,253 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Task
+
+
+def make_admin(username='admin'):
+    user = User.objects.create_user(username, f'{username}@example.com', 'pw')
+    user.profile.role = 'admin'
+    user.profile.save()
+    return user
+
+
+def make_task(client, **kwargs):
+    kwargs.setdefault('deadline', timezone.now() + timedelta(days=2))
+    return Task.objects.create(client=client, subject='Math', title='T', description='d', **kwargs)
+
+
+def api_client(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+class KeysetCursorTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('student', 's@example.com', 'pw')
+        self.admin = make_admin()
+        for _ in range(3):
+            make_task(self.client_user)
+
+    def cursor(self, token):
+        return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+
+    def test_next_link_pages_through(self):
+        api = api_client(self.admin)
+        first = api.get('/api/admin/users/%d/tasks/' % self.client_user.pk, {'page_size': 2}).data
+        second = api.get(first['next']).data
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+        self.assertIsNone(second['next'])
+
+    def test_user_detail_keeps_first_task_page(self):
+        response = api_client(self.admin).get('/api/admin/users/%d/' % self.client_user.pk, {'page_size': 2})
+        self.assertEqual(len(response.data['tasks']), 2)
+        self.assertIn('/api/admin/users/%d/tasks/' % self.client_user.pk, response.data['tasks_next'])
+        self.assertEqual(response.data['task_stats']['total'], 3)
+
+    def test_tampered_cursor_is_404(self):
+        api = api_client(self.admin)
+        url = '/api/admin/users/%d/tasks/' % self.client_user.pk
+        for token in (
+            {'p': ['x', 'y'], 'r': 0, 'o': '-created_at,-id'},
+            {'p': [timezone.now().isoformat(), 'y'], 'r': 0, 'o': '-created_at,-id'},
+            {'p': [None, 1], 'r': 0, 'o': '-created_at,-id'},
+            {'p': [1], 'r': 0, 'o': '-created_at,-id'},
+        ):
+            response = api.get(url, {'cursor': self.cursor(token)})
+            self.assertEqual(response.status_code, 404, token)
+
+    def test_tampered_cursor_on_annotated_sort_is_404(self):
+        response = api_client(self.admin).get(
+            '/api/admin/tasks/', {'sort': 'priority', 'cursor': self.cursor({'p': ['x', 1], 'r': 0, 'o': 'priority_rank,id'})}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ListETagTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('student', 's@example.com', 'pw')
+        self.other = User.objects.create_user('other', 'o@example.com', 'pw')
+        self.admin = make_admin()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = make_task(self.client_user)
+
+    def etag(self, user, url='/api/tasks/'):
+        response = api_client(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def revalidate(self, user, etag, url='/api/tasks/'):
+        return api_client(user).get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_list_is_one_lookup(self):
+        etag = self.etag(self.client_user)
+        api = api_client(self.client_user)
+        with self.assertNumQueries(1):  # the ListVersion rows
+            response = api.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        etag = self.etag(self.client_user)
+        admin_etag = self.etag(self.admin)
+        other_etag = self.etag(self.other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.progress = 40
+            self.task.save()
+        self.assertEqual(self.revalidate(self.client_user, etag), 200)
+        self.assertEqual(self.revalidate(self.admin, admin_etag), 200)
+        # Someone else's task isn't in this list
+        self.assertEqual(self.revalidate(self.other, other_etag), 304)
+
+        etag = self.etag(self.client_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.messages.create(sender=self.admin, message='hi')
+        self.assertEqual(self.revalidate(self.client_user, etag), 200)
+
+        etag = self.etag(self.client_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertEqual(self.revalidate(self.client_user, etag), 200)
+
+    def test_category_change_changes_task_lists(self):
+        from .models import TaskCategory
+        etag = self.etag(self.client_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskCategory.objects.create(name='Essays')
+        self.assertEqual(self.revalidate(self.client_user, etag), 200)
+
+    def test_notifications_etag(self):
+        from .notifications import fan_out, mark_read
+        url = '/api/notifications/'
+        etag = self.etag(self.client_user, url)
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out([self.client_user.pk], 'Hello', 'World')
+        self.assertEqual(self.revalidate(self.client_user, etag, url), 200)
+        etag = self.etag(self.client_user, url)
+        self.assertEqual(self.revalidate(self.client_user, etag, url), 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_read(self.client_user)
+        self.assertEqual(self.revalidate(self.client_user, etag, url), 200)
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('student', 's@example.com', 'pw')
+
+    def changes(self, cursor=None):
+        params = {'since': cursor} if cursor else {}
+        return api_client(self.client_user).get('/api/tasks/changes/', params).data
+
+    def tombstone(self, **kwargs):
+        from .models import TaskTombstone
+        return TaskTombstone.objects.create(client_pk=self.client_user.pk, task_pk=kwargs.pop('task_pk', 1),
+                                            reason='deleted', **kwargs)
+
+    def test_late_tombstone_with_lower_id_is_not_skipped(self):
+        from .models import TaskTombstone
+        self.tombstone(id=20, task_pk=2)
+        first = self.changes()
+        self.assertEqual([t['id'] for t in first['removed']], [2])
+
+        # A delete that got its id earlier commits only now
+        self.tombstone(id=10, task_pk=1)
+        second = self.changes(first['cursor'])
+        self.assertEqual(sorted(t['id'] for t in second['removed']), [1, 2])
+
+        # Once settled, the cursor moves past both
+        TaskTombstone.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        third = self.changes(second['cursor'])
+        self.assertEqual(len(third['removed']), 2)
+        self.assertEqual(self.changes(third['cursor'])['removed'], [])
+
+    def test_update_fields_save_reaches_delta_sync(self):
+        task = make_task(self.client_user)
+        Task.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        cursor = self.changes()['cursor']
+        self.assertEqual(self.changes(cursor)['updated'], [])
+        task.progress = 50
+        task.save(update_fields=['progress'])
+        self.assertEqual([t['id'] for t in self.changes(cursor)['updated']], [task.pk])
+
+
+@override_settings(NOTIFICATION_COUNT_CACHE='default',
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student', 's@example.com', 'pw')
+
+    def test_rolled_back_notification_does_not_count(self):
+        from .models import Notification
+        from .notifications import unread_count
+        self.assertEqual(unread_count(self.user.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Notification.objects.create(user=self.user, title='t', message='m')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(unread_count(self.user.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='t', message='m')
+        self.assertEqual(unread_count(self.user.pk), 1)
+
+
+class DeadlineReminderTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('student', 's@example.com', 'pw')
+
+    def test_stale_save_does_not_resend_a_tier(self):
+        from .models import Notification
+        from .reminders import send_due_reminders
+        task = make_task(self.client_user, deadline=timezone.now() + timedelta(hours=20))
+        stale = Task.objects.get(pk=task.pk)
+
+        self.assertEqual(send_due_reminders(), 1)
+        stale.progress = 30
+        stale.save()
+        self.assertEqual(send_due_reminders(), 0)
+        self.assertEqual(Notification.objects.filter(notification_type='deadline_approaching').count(), 1)
+
+        # Moving the deadline still re-arms the tiers
+        stale.deadline = timezone.now() + timedelta(hours=10)
+        stale.save()
+        self.assertEqual(send_due_reminders(), 1)
+
+
+class ChatReadTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('student', 's@example.com', 'pw')
+        self.admin = make_admin()
+        self.task = make_task(self.client_user)
+        self.messages = [self.task.messages.create(sender=self.admin, message=str(i)) for i in range(3)]
+
+    def test_cursor_only_moves_forward_in_one_statement(self):
+        from .chat_read import mark_read_up_to
+        version = Task.objects.get(pk=self.task.pk).version
+        with self.assertNumQueries(1):
+            self.assertEqual(mark_read_up_to(self.client_user, self.task.pk, self.messages[1].id,
+                                             client_id=self.client_user.pk), self.messages[1].id)
+        self.assertIsNone(mark_read_up_to(self.client_user, self.task.pk, self.messages[0].id))
+        self.assertEqual(mark_read_up_to(self.client_user, self.task.pk, 10 ** 9), self.messages[2].id)
+        self.assertIsNone(mark_read_up_to(self.client_user, self.task.pk))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).version, version)
+
+    def test_read_changes_the_detail_etag(self):
+        from .chat_read import mark_read_up_to
+        api = api_client(self.client_user)
+        url = '/api/tasks/%d/' % self.task.pk
+        response = api.get(url)
+        self.assertEqual(response.data['unread_messages'], 3)
+        mark_read_up_to(self.client_user, self.task.pk)
+        response = api.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unread_messages'], 0)
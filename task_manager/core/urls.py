@@ -3,6 +3,7 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from . import views
+from . import admin_api
 
 urlpatterns = [
     # AUTH
@@ -17,6 +18,8 @@ urlpatterns = [
 
     # TASKS (Client + Admin)
     path('api/tasks/', views.TaskListCreate.as_view(), name='task-list'),
+    path('api/tasks/search/', views.TaskSearchView.as_view(), name='task-search'),
+    path('api/tasks/changes/', views.TaskChangesView.as_view(), name='task-changes'),
     path('api/tasks/<int:pk>/', views.TaskDetail.as_view(), name='task-detail'),
     
     # CLIENT TASK ACTIONS
@@ -37,13 +40,27 @@ urlpatterns = [
     path('api/admin/tasks/<int:pk>/reject/', views.AdminRejectTask.as_view(), name='admin-reject-task'),
     path('api/admin/tasks/<int:pk>/upload-solution/', views.AdminUploadSolution.as_view(), name='admin-upload-solution'),
 
+    # ADMIN TASK / USER BROWSING
+    path('api/admin/tasks/', admin_api.AdminTaskViewSet.as_view({'get': 'list'}), name='admin-task-list'),
+    path('api/admin/tasks/bulk/', admin_api.AdminTaskViewSet.as_view({'post': 'bulk'}), name='admin-task-bulk'),
+    path('api/admin/tasks/<int:pk>/', admin_api.AdminTaskViewSet.as_view({'get': 'retrieve'}), name='admin-task-detail'),
+    path('api/admin/export/<slug:dataset>.<slug:fmt>', admin_api.AdminExportView.as_view(), name='admin-export'),
+    path('api/admin/users/', admin_api.AdminUserViewSet.as_view({'get': 'list'}), name='admin-user-list'),
+    path('api/admin/users/<int:pk>/', admin_api.AdminUserViewSet.as_view({'get': 'retrieve'}), name='admin-user-detail'),
+    path('api/admin/users/<int:pk>/tasks/', admin_api.AdminUserViewSet.as_view({'get': 'tasks'}), name='admin-user-tasks'),
+
     # ADMIN STATS
     path('api/admin/stats/', views.AdminStatsView.as_view(), name='admin-stats'),
 
     # CHAT
     path('api/tasks/<int:task_id>/chat/', views.ChatMessageListCreate.as_view(), name='chat-messages'),
+    path('api/tasks/<int:task_id>/chat/mark-read/', views.ChatMarkRead.as_view(), name='chat-mark-read'),
 
     # NOTIFICATIONS
     path('api/notifications/', views.NotificationList.as_view(), name='notification-list'),
     path('api/notifications/<int:pk>/read/', views.MarkNotificationRead.as_view(), name='mark-notification-read'),
+    path('api/notifications/mark-read/', views.MarkNotificationsRead.as_view(), name='mark-notifications-read'),
+    path('api/notifications/mark-unread/', views.MarkNotificationsUnread.as_view(), name='mark-notifications-unread'),
+    path('api/notifications/mark-all-read/', views.MarkAllNotificationsRead.as_view(), name='mark-all-notifications-read'),
+    path('api/notifications/unread-count/', views.NotificationUnreadCount.as_view(), name='notification-unread-count'),
 ]
@@ -8,22 +8,35 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.contrib.auth.models import User
+import functools
+
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from django.utils import timezone
-from .email_service import send_new_task_notification
+from django.db import transaction
+from django.db.models import Sum
 from rest_framework.views import APIView
-from .models import TaskCategory, Task, ChatMessage, Notification, UserProfile, TaskFile, Revision, BudgetProposal
+from .models import TaskCategory, Task, ChatMessage, ChatReadCursor, Notification, UserProfile, TaskFile, Revision, BudgetProposal, TaskTombstone
 from .serializers import (
-    UserSerializer, TaskSerializer, ChatMessageSerializer,
+    UserSerializer, TaskSerializer, TaskSummarySerializer, ChatMessageSerializer,
     NotificationSerializer, TaskCategorySerializer,
     UserRegistrationSerializer, CustomTokenObtainPairSerializer,
-    TaskFileSerializer, RevisionSerializer, BudgetProposalSerializer
+    TaskFileSerializer, RevisionSerializer, BudgetProposalSerializer, TASK_REF_COLUMNS
 )
-from .tasks import notify_task_status_update, create_notification
+from .tasks import notify_task_status_update, create_notification, notify_new_task
+from .pagination import TaskCursorPagination, RankedPagination, NotificationCursorPagination
+from .search import search_tasks
+from .filters import TaskFilterViewMixin
+from .cache import serialize_task
+from .sync import changes_since, cursor_expired, visible_tombstones, InvalidCursor
+from .fieldsets import SparseFieldsetViewMixin, parse_csv_param
+from .notifications import mark_read, mark_unread, unread_count
+from .chat_read import mark_read_up_to
+from .outbox import enqueue_broadcast, enqueue_task
+from .broadcast import TaskBroadcast, broadcast_task_update
+from .conditional import ConditionalGetMixin, make_etag, etag_matches, not_modified, set_etag
+from . import list_versions
 
 def healthz(_request):
     return JsonResponse({"ok": True})
@@ -37,25 +50,40 @@ class IsAdmin(permissions.BasePermission):
             request.user.profile.role == "admin"
         )
 
+def atomic_write(view):
+    """
+    Run `view` in one transaction, rolled back if it answers with an error.
+    Outbox messages (core.outbox) are written in the same transaction, so
+    nothing is sent for a write that didn't happen. Task broadcasts are
+    collected for the whole request and queued once it succeeded
+    (core.broadcast).
+    """
+    @functools.wraps(view)
+    def wrapped(request, *args, **kwargs):
+        request.task_broadcast = TaskBroadcast()
+        request.serialized_tasks = {}
+        with transaction.atomic():
+            response = view(request, *args, **kwargs)
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+            else:
+                request.task_broadcast.flush()
+            return response
+    return wrapped
+
 class AuthenticatedAPIView(generics.GenericAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in permissions.SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        return atomic_write(super().dispatch)(request, *args, **kwargs)
+
 class BroadcastMixin:
     def _broadcast_task_update(self, request, task):
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': request}).data
-            # Broadcast to task-specific room
-            async_to_sync(channel_layer.group_send)(
-                f"task_{task.id}",
-                {"type": "task_updated", "task": task_data}
-            )
-            # Broadcast to admin dashboard
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
+        # Task room, admin dashboard and the client's group, once the request succeeds
+        broadcast_task_update(request, task)
 
 # Auth Views
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -68,7 +96,7 @@ class RegisterView(generics.CreateAPIView):
 class CurrentUserView(AuthenticatedAPIView):
     def get(self, request):
         profile = request.user.profile if hasattr(request.user, 'profile') else None
-        return Response({
+        payload = {
             "id": request.user.id,
             "username": request.user.username,
             "email": request.user.email,
@@ -83,76 +111,156 @@ class CurrentUserView(AuthenticatedAPIView):
             "completed_tasks": profile.completed_tasks if profile else 0,
             "earnings": float(profile.earnings) if profile and profile.earnings else 0,
             "is_verified": profile.is_verified if profile else False,
-        })
+        }
+        # Building the payload is cheap (the profile is the only query); hash it directly
+        etag = make_etag(request, *sorted(payload.items()))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return set_etag(Response(payload), etag)
 
 # Task Categories
-class TaskCategoryListCreate(AuthenticatedAPIView, generics.ListCreateAPIView):
+class TaskCategoryListCreate(ConditionalGetMixin, AuthenticatedAPIView, generics.ListCreateAPIView):
     queryset = TaskCategory.objects.all()
     serializer_class = TaskCategorySerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
-class TaskCategoryDetail(AuthenticatedAPIView, generics.RetrieveUpdateDestroyAPIView):
+    def get_etag_validator(self, request, *args, **kwargs):
+        return list_versions.versions(list_versions.CATEGORIES)
+
+class TaskCategoryDetail(ConditionalGetMixin, AuthenticatedAPIView, generics.RetrieveUpdateDestroyAPIView):
     queryset = TaskCategory.objects.all()
     serializer_class = TaskCategorySerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    def get_etag_validator(self, request, *args, **kwargs):
+        updated_at = TaskCategory.objects.filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        return (updated_at,) if updated_at else None
+
+def visible_tasks(user):
+    """Everything for admins, only their own tasks for clients."""
+    profile = getattr(user, "profile", None)
+    role = getattr(profile, "role", "client") if profile else "client"
+    if role == "admin":
+        return Task.objects.all()
+    return Task.objects.filter(client=user)
+
+def task_list_serializer(request):
+    """
+    Task lists return full tasks by default, as the dashboards render them;
+    ?view=summary opts in to compact rows without chat, files, revisions or profiles.
+    """
+    if request.query_params.get('view') == 'summary':
+        return TaskSummarySerializer
+    return TaskSerializer
+
+def _deadline_clock():
+    # days_until_deadline / is_overdue drift with time; cap validator lifetime at a minute
+    return timezone.now().replace(second=0, microsecond=0)
+
 # Tasks - Unified Client & Admin
-class TaskListCreate(AuthenticatedAPIView, generics.ListCreateAPIView, BroadcastMixin):
+class TaskListCreate(ConditionalGetMixin, TaskFilterViewMixin, SparseFieldsetViewMixin, AuthenticatedAPIView, generics.ListCreateAPIView, BroadcastMixin):
     serializer_class = TaskSerializer
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = TaskCursorPagination  # opt-in via ?cursor= / ?page_size=
+    fieldset_always_columns = ('created_at', 'deadline')  # keyset columns for ?sort=
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return task_list_serializer(self.request)
+        return TaskSerializer
 
     def get_queryset(self):
-        profile = getattr(self.request.user, "profile", None)
-        role = getattr(profile, "role", "client") if profile else "client"
-        
-        if role == "admin":
-            return Task.objects.all().select_related(
-                'client', 'assigned_admin', 'category', 'timezone'
-            ).prefetch_related('files', 'revisions', 'messages').order_by('-created_at')
-        
-        return Task.objects.filter(client=self.request.user).select_related(
-            'client', 'assigned_admin', 'category', 'timezone'
-        ).prefetch_related('files', 'revisions', 'messages').order_by('-created_at')
+        # Joins, prefetches and columns follow ?fields= / ?expand=
+        return self.optimize_queryset(visible_tasks(self.request.user)).order_by('-created_at')
+
+    def get_etag_validator(self, request, *args, **kwargs):
+        # One primary-key lookup: writes bump the viewer's task list (core.list_versions)
+        scopes = list_versions.task_scope(request.user), list_versions.CATEGORIES
+        return (*list_versions.versions(*scopes), _deadline_clock())
 
     def perform_create(self, serializer):
         task = serializer.save(client=self.request.user)
 
-        #send notification to admins
-        send_new_task_notification(task)
+        # Notify admins (email + in-app) from one background job, once committed
+        enqueue_task(notify_new_task, task.id)
         
         # Broadcast to admin dashboard
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': self.request}).data
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_created", "task": task_data}
-            )
+        broadcast_task_update(self.request, task, 'task_created')
 
-class TaskDetail(AuthenticatedAPIView, generics.RetrieveUpdateDestroyAPIView, BroadcastMixin):
+class TaskDetail(ConditionalGetMixin, SparseFieldsetViewMixin, AuthenticatedAPIView, generics.RetrieveUpdateDestroyAPIView, BroadcastMixin):
     serializer_class = TaskSerializer
 
     def get_queryset(self):
-        profile = getattr(self.request.user, "profile", None)
-        role = getattr(profile, "role", "client") if profile else "client"
-        if role == "admin":
-            return Task.objects.all().select_related(
-                'client', 'assigned_admin', 'category', 'timezone'
-            ).prefetch_related('files', 'revisions', 'messages')
-        return Task.objects.filter(client=self.request.user).select_related(
-            'client', 'assigned_admin', 'category', 'timezone'
-        ).prefetch_related('files', 'revisions', 'messages')
+        queryset = visible_tasks(self.request.user)
+        if self.request.method == 'GET':
+            return self.optimize_queryset(queryset)
+        return queryset.select_related(
+            'client__profile', 'assigned_admin__profile', 'category', 'timezone'
+        ).prefetch_related(
+            'files__uploaded_by', 'revisions__requested_by', 'messages__sender__profile'
+        ).with_unread_counts(self.request.user)
+
+    def get_etag_validator(self, request, *args, **kwargs):
+        # Chat reads don't bump the version; unread counts and is_read follow the read positions
+        row = visible_tasks(request.user).filter(pk=kwargs['pk']).with_read_positions().values_list(
+            'version', 'updated_at', 'client_read_id', 'staff_read_id'
+        ).first()
+        return (*row, _deadline_clock()) if row else None
 
     def perform_update(self, serializer):
         task = serializer.save()
         self._broadcast_task_update(self.request, task)
 
+class TaskSearchView(SparseFieldsetViewMixin, AuthenticatedAPIView, generics.ListAPIView):
+    """GET /api/tasks/search/?q=<terms> — ranked full-text search over visible tasks."""
+    serializer_class = TaskSummarySerializer
+    pagination_class = RankedPagination
+
+    def get_queryset(self):
+        queryset = self.optimize_queryset(visible_tasks(self.request.user))
+        return search_tasks(queryset, self.request.query_params.get('q', ''))
+
+class TaskChangesView(AuthenticatedAPIView):
+    """
+    GET /api/tasks/changes/?since=<cursor>
+    Tasks created/updated and tombstones (deleted/withdrawn) since the cursor.
+    Omit `since` to start from the beginning; keep calling with the returned
+    cursor while `has_more` is true. `reset` means the cursor is too old —
+    reload /api/tasks/ and start over.
+    """
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        try:
+            if cursor_expired(since):
+                return Response({"reset": True, "cursor": None, "updated": [], "removed": [], "has_more": False})
+            rows, removed, cursor, has_more = changes_since(
+                visible_tasks(request.user).select_related('client', 'assigned_admin', 'category')
+                .with_unread_counts(request.user),
+                visible_tombstones(request.user),
+                since,
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "reset": False,
+            "cursor": cursor,
+            "has_more": has_more,
+            "updated": TaskSummarySerializer(rows, many=True, context={'request': request}).data,
+            "removed": [
+                {"id": t.task_pk, "task_id": t.task_id, "reason": t.reason, "at": t.created_at}
+                for t in removed
+            ],
+        })
+
 # ============================================================================
 # CLIENT BUDGET NEGOTIATION ENDPOINTS - ADD THESE
 # ============================================================================
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_accept_budget(request, pk):
     """
     Client accepts the admin's counter budget offer
@@ -173,17 +281,12 @@ def client_accept_budget(request, pk):
         task.save()
         
         # BROADCAST TO ADMIN DASHBOARD — THIS WAS MISSING!
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': request}).data
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
+        broadcast_task_update(request, task)
 
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Budget Accepted",
                 f"Client accepted your budget proposal of ${task.budget} for task '{task.title}'",
@@ -207,6 +310,7 @@ def client_accept_budget(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_counter_budget(request, pk):
     """
     Client sends a counter budget offer
@@ -237,17 +341,12 @@ def client_counter_budget(request, pk):
         task.save()
 
         # THIS IS THE MAGIC — now properly closed and consistent
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': request}).data
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
+        broadcast_task_update(request, task)
 
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Budget Counter-Offer Received",
                 f"Client countered with ${amount} for task '{task.title}'",
@@ -271,6 +370,7 @@ def client_counter_budget(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_reject_budget(request, pk):
     """
     Client rejects the budget negotiation
@@ -288,7 +388,8 @@ def client_reject_budget(request, pk):
         
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Budget Rejected",
                 f"Client rejected the budget negotiation for task '{task.title}'",
@@ -320,6 +421,7 @@ def can_withdraw_task(task):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_withdraw_task(request, pk):
     """
     Client withdraws a task
@@ -336,10 +438,12 @@ def client_withdraw_task(request, pk):
         task.status = 'withdrawn'
         task.withdrawal_reason = reason
         task.save()
+        TaskTombstone.record(task, 'withdrawn')
         
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Task Withdrawn",
                 f"Client withdrew task '{task.title}'. Reason: {reason}",
@@ -363,6 +467,7 @@ def client_withdraw_task(request, pk):
 # Add these functions with the other client actions (around line 250)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_approve_task(request, pk):
     """Client approves and completes the task"""
     try:
@@ -385,7 +490,8 @@ def client_approve_task(request, pk):
         
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Task Approved",
                 f"Client approved and completed task '{task.title}'",
@@ -394,17 +500,7 @@ def client_approve_task(request, pk):
             )
         
         # Broadcast update
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': request}).data
-            async_to_sync(channel_layer.group_send)(
-                f"task_{task.id}",
-                {"type": "task_updated", "task": task_data}
-            )
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
+        broadcast_task_update(request, task)
         
         return Response({
             'status': 'success',
@@ -421,6 +517,7 @@ def client_approve_task(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@atomic_write
 def client_request_revision(request, pk):
     """Client requests revision for the task"""
     try:
@@ -446,7 +543,8 @@ def client_request_revision(request, pk):
         
         # Notify admin
         if task.assigned_admin:
-            create_notification.delay(
+            enqueue_task(
+                create_notification,
                 task.assigned_admin.id,
                 "Revision Requested",
                 f"Client requested revision for task '{task.title}'. Feedback: {feedback}",
@@ -455,17 +553,7 @@ def client_request_revision(request, pk):
             )
         
         # Broadcast update
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            task_data = TaskSerializer(task, context={'request': request}).data
-            async_to_sync(channel_layer.group_send)(
-                f"task_{task.id}",
-                {"type": "task_updated", "task": task_data}
-            )
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
+        broadcast_task_update(request, task)
         
         return Response({
             'status': 'success',
@@ -504,14 +592,14 @@ class AdminAcceptTask(AuthenticatedAPIView, BroadcastMixin):
         task.save()
 
         # Notify student
-        notify_task_status_update.delay(
+        enqueue_task(
+            notify_task_status_update,
             task.id, 
             f"Your task '{task.title}' has been accepted by {request.user.get_full_name() or request.user.username} and work has begun."
         )
 
         self._broadcast_task_update(request, task)
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serialize_task(task, request), status=status.HTTP_200_OK)
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AdminProposeBudget(AuthenticatedAPIView, BroadcastMixin):
@@ -542,7 +630,8 @@ class AdminProposeBudget(AuthenticatedAPIView, BroadcastMixin):
         task.save()
 
         # Notify student
-        create_notification.delay(
+        enqueue_task(
+            create_notification,
             task.client.id,
             "Budget Counter-Offer Received",
             f"Expert has proposed a counter-offer of ${amount} for your task '{task.title}'",
@@ -553,7 +642,7 @@ class AdminProposeBudget(AuthenticatedAPIView, BroadcastMixin):
         self._broadcast_task_update(request, task)
         return Response({
             "detail": "Budget proposal sent successfully",
-            "task": TaskSerializer(task, context={'request': request}).data,
+            "task": serialize_task(task, request),
             "proposal": BudgetProposalSerializer(proposal).data
         })
 
@@ -612,7 +701,8 @@ class AdminAcceptBudget(AuthenticatedAPIView, BroadcastMixin):
         task.save()
 
         # Notify client via email/notification
-        notify_task_status_update.delay(
+        enqueue_task(
+            notify_task_status_update,
             task.id,
             f"Expert has accepted your budget of ${accepted_amount} and started working on your task."
         )
@@ -620,8 +710,7 @@ class AdminAcceptBudget(AuthenticatedAPIView, BroadcastMixin):
         # Broadcast to WebSocket listeners (admin dashboard + task room)
         self._broadcast_task_update(request, task)
 
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return Response(serialize_task(task, request))
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -650,8 +739,7 @@ class AdminUpdateProgress(AuthenticatedAPIView, BroadcastMixin):
             )
 
         self._broadcast_task_update(request, task)
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return Response(serialize_task(task, request))
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AdminSubmitForReview(AuthenticatedAPIView, BroadcastMixin):
@@ -668,14 +756,14 @@ class AdminSubmitForReview(AuthenticatedAPIView, BroadcastMixin):
         task.save()
 
         # Notify student
-        notify_task_status_update.delay(
+        enqueue_task(
+            notify_task_status_update,
             task.id,
             f"Your task '{task.title}' is ready for review. Please check the submitted work."
         )
 
         self._broadcast_task_update(request, task)
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return Response(serialize_task(task, request))
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AdminMarkComplete(AuthenticatedAPIView, BroadcastMixin):
@@ -700,14 +788,14 @@ class AdminMarkComplete(AuthenticatedAPIView, BroadcastMixin):
         admin_profile.save()
 
         # Notify student
-        notify_task_status_update.delay(
+        enqueue_task(
+            notify_task_status_update,
             task.id,
             f"Your task '{task.title}' has been completed successfully."
         )
 
         self._broadcast_task_update(request, task)
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return Response(serialize_task(task, request))
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AdminRejectTask(AuthenticatedAPIView, BroadcastMixin):
@@ -727,14 +815,14 @@ class AdminRejectTask(AuthenticatedAPIView, BroadcastMixin):
         task.save()
 
         # Notify student
-        notify_task_status_update.delay(
+        enqueue_task(
+            notify_task_status_update,
             task.id,
             f"Your task '{task.title}' has been rejected. Reason: {reason}"
         )
 
         self._broadcast_task_update(request, task)
-        serializer = TaskSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return Response(serialize_task(task, request))
 
 # File Upload
 @method_decorator(csrf_exempt, name='dispatch')
@@ -742,8 +830,10 @@ class AdminUploadSolution(AuthenticatedAPIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def post(self, request, pk):
-        # 1. Get task
-        task = get_object_or_404(Task, pk=pk)
+        # 1. Get task (with what the serializer reads, for step 6)
+        task = get_object_or_404(
+            Task.objects.select_related('client', 'assigned_admin', 'category', 'timezone'), pk=pk
+        )
 
         # 2. Get file
         file = request.FILES.get("solution") or request.FILES.get("file")
@@ -766,31 +856,14 @@ class AdminUploadSolution(AuthenticatedAPIView):
             task.progress = 100
             task.save(update_fields=['status', 'progress'])
 
-        # 5. RE-READ TASK FROM DATABASE — this is the nuclear option
-        from django.db import connection
-        task = Task.objects.select_related('client', 'assigned_admin', 'category', 'timezone')\
-                          .prefetch_related('files', 'revisions', 'messages')\
-                          .get(pk=task.pk)
+        # 5. Serialize FRESH data. `task` is current: the saves above refreshed
+        # its version, and its files, revisions and messages aren't prefetched
+        task_data = serialize_task(task, request)
 
-        # 6. Serialize FRESH data
-        task_data = TaskSerializer(task, context={'request': request}).data
+        # 6. Broadcast (one frame per group, sent from the outbox once committed)
+        broadcast_task_update(request, task)
 
-        # 7. Broadcast to BOTH places — manually, no mixin
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
-
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            async_to_sync(channel_layer.group_send)(
-                f"task_{task.id}",
-                {"type": "task_updated", "task": task_data}
-            )
-            async_to_sync(channel_layer.group_send)(
-                "admin_dashboard",
-                {"type": "task_updated", "task": task_data}
-            )
-
-        # 8. Return fresh data
+        # 7. Return fresh data
         return Response({
             "detail": "Solution uploaded — awaiting student approval",
             "task": task_data
@@ -816,28 +889,129 @@ class ChatMessageListCreate(AuthenticatedAPIView, generics.ListCreateAPIView):
         message = serializer.save(task=task, sender=self.request.user)
 
         # Broadcast message via WebSocket
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            msg_data = ChatMessageSerializer(message, context={'request': self.request}).data
-            async_to_sync(channel_layer.group_send)(
-                f"task_{task.id}",
-                {"type": "chat_message", "message": msg_data}
-            )
+        msg_data = ChatMessageSerializer(message, context={'request': self.request}).data
+        enqueue_broadcast(f"task_{task.id}", {"type": "chat_message", "message": msg_data})
+
+class ChatMarkRead(AuthenticatedAPIView):
+    """POST /api/tasks/<task_id>/chat/mark-read/ {"up_to": <message id>} — one cursor upsert"""
+    def post(self, request, task_id):
+        task = get_object_or_404(visible_tasks(request.user).only('id', 'client_id'), pk=task_id)
+        up_to = request.data.get('up_to')
+        if up_to is not None:
+            try:
+                up_to = int(up_to)
+            except (TypeError, ValueError):
+                return Response({"error": "up_to must be a message id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        position = mark_read_up_to(request.user, task.pk, up_to, client_id=task.client_id)
+        if position:
+            enqueue_broadcast(f"task_{task.pk}", {"type": "messages_read", "user_id": request.user.pk, "up_to": position})
+        else:
+            position = ChatReadCursor.objects.filter(task=task, user=request.user).values_list(
+                'last_read_message_id', flat=True
+            ).first() or 0
+        return Response({
+            "last_read_message_id": position,
+            "unread_messages": task.unread_messages_count(request.user),
+        })
 
 # Notifications
-class NotificationList(AuthenticatedAPIView, generics.ListAPIView):
+class NotificationList(ConditionalGetMixin, AuthenticatedAPIView, generics.ListAPIView):
+    """
+    Notifications carry a compact task reference. ?include=tasks side-loads
+    the referenced tasks (summary form) once each under "tasks";
+    ?cursor= / ?page_size= opt in to keyset pages.
+    """
     serializer_class = NotificationSerializer
+    pagination_class = NotificationCursorPagination
+
+    def get_etag_validator(self, request, *args, **kwargs):
+        # The notifications, and the tasks they reference or side-load
+        scopes = (
+            list_versions.notifications(request.user.pk),
+            list_versions.task_scope(request.user),
+            list_versions.CATEGORIES,
+        )
+        return (*list_versions.versions(*scopes), _deadline_clock())
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).select_related('task').order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user).select_related('task').only(
+            'id', 'title', 'message', 'is_read', 'created_at', 'task', *TASK_REF_COLUMNS
+        ).order_by('-created_at', '-id')
+
+    def included_tasks(self, notifications):
+        # Each referenced task once, in one batch, whatever the page size
+        task_ids = list(dict.fromkeys(n.task_id for n in notifications if n.task_id))
+        if not task_ids:
+            return []
+        context = self.get_serializer_context()
+        serializer = TaskSummarySerializer(context=context)
+        tasks = serializer.optimize_queryset(Task.objects.filter(pk__in=task_ids))
+        return TaskSummarySerializer(tasks, many=True, context=context).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        data = self.get_serializer(rows, many=True).data
+
+        include = parse_csv_param(request, 'include') or set()
+        if page is not None:
+            payload = self.paginator.get_paginated_data(data)
+        elif 'tasks' in include:
+            payload = {'results': data}
+        else:
+            return Response(data)
+        if 'tasks' in include:
+            payload['tasks'] = self.included_tasks(rows)
+        return Response(payload)
 
 class MarkNotificationRead(AuthenticatedAPIView):
     def post(self, request, pk):
-        notification = get_object_or_404(Notification, pk=pk, user=request.user)
-        notification.is_read = True
-        notification.save()
+        get_object_or_404(Notification.objects.only('id'), pk=pk, user=request.user)
+        mark_read(request.user, [pk])
         return Response({"detail": "Notification marked as read"})
 
+def _notification_ids(request):
+    """ids from ?ids=1,2 or a JSON body {"ids": [1, 2]}"""
+    ids = parse_csv_param(request, 'ids')
+    if ids is None:
+        ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+    if not ids:
+        return None
+    try:
+        return {int(pk) for pk in ids}
+    except (TypeError, ValueError):
+        return None
+
+class MarkNotificationsRead(AuthenticatedAPIView):
+    """POST /api/notifications/mark-read/?ids=1,2,3 — one UPDATE for the lot"""
+    def post(self, request):
+        ids = _notification_ids(request)
+        if ids is None:
+            return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+        updated = mark_read(request.user, ids)
+        return Response({"updated": updated, "unread_count": unread_count(request.user.pk)})
+
+class MarkNotificationsUnread(AuthenticatedAPIView):
+    """POST /api/notifications/mark-unread/?ids=1,2,3"""
+    def post(self, request):
+        ids = _notification_ids(request)
+        if ids is None:
+            return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+        updated = mark_unread(request.user, ids)
+        return Response({"updated": updated, "unread_count": unread_count(request.user.pk)})
+
+class MarkAllNotificationsRead(AuthenticatedAPIView):
+    def post(self, request):
+        updated = mark_read(request.user)
+        return Response({"updated": updated, "unread_count": unread_count(request.user.pk)})
+
+class NotificationUnreadCount(AuthenticatedAPIView):
+    """GET /api/notifications/unread-count/ — served from the per-user counter"""
+    def get(self, request):
+        return Response({"unread_count": unread_count(request.user.pk)})
+
 # Admin Stats
 class AdminStatsView(AuthenticatedAPIView):
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -5,6 +5,7 @@ from datetime import timedelta
 
 from dotenv import load_dotenv
 import dj_database_url
+from celery.schedules import crontab
 
 load_dotenv()
 
@@ -47,6 +48,8 @@ FRONTEND_ORIGINS = get_csv("FRONTEND_ORIGINS", [])
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN")  # single value compatibility
 if FRONTEND_ORIGIN and FRONTEND_ORIGIN not in FRONTEND_ORIGINS:
     FRONTEND_ORIGINS.append(FRONTEND_ORIGIN)
+# Base of the links in emails (core/email_service.py)
+FRONTEND_URL = os.getenv("FRONTEND_URL") or FRONTEND_ORIGIN or (FRONTEND_ORIGINS[0] if FRONTEND_ORIGINS else "")
 
 BACKEND_ORIGIN = os.getenv("BACKEND_ORIGIN")  # e.g., https://yourservice.up.railway.app
 
@@ -133,6 +136,31 @@ if REDIS_URL:
         }
     }
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Cache – shared Redis cache when available, per-process memory otherwise
+# ─────────────────────────────────────────────────────────────────────────────
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# Serialized-task cache (core/cache.py): in-process LRU + optional shared tier
+TASK_CACHE_SIZE = int(os.getenv("TASK_CACHE_SIZE", "512"))
+TASK_CACHE_ALIAS = os.getenv("TASK_CACHE_ALIAS", "default" if REDIS_URL else "") or None
+TASK_CACHE_TIMEOUT = int(os.getenv("TASK_CACHE_TIMEOUT", "300"))
+
+# Unread notification badge counter (core/notifications.py); needs a cache
+# shared by all processes, counted from the DB when there is none
+NOTIFICATION_COUNT_CACHE = os.getenv("NOTIFICATION_COUNT_CACHE", "default" if REDIS_URL else "") or None
+NOTIFICATION_COUNT_TIMEOUT = int(os.getenv("NOTIFICATION_COUNT_TIMEOUT", "3600"))
+
+# Delta sync (/api/tasks/changes/)
+SYNC_SETTLE_SECONDS = int(os.getenv("SYNC_SETTLE_SECONDS", "5"))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", "30"))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Celery (broker=result via Redis; results in DB)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -142,6 +170,56 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Africa/Nairobi"
+CELERY_BEAT_SCHEDULE = {
+    "deadline-reminders": {
+        "task": "core.tasks.check_deadlines",
+        "schedule": 60.0,
+    },
+    "prune-task-tombstones": {
+        "task": "core.tasks.prune_task_tombstones",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "chat-digests": {
+        "task": "core.tasks.send_chat_digests",
+        "schedule": 60.0,
+    },
+    "drain-outbox": {
+        "task": "core.tasks.drain_outbox",
+        "schedule": float(os.getenv("OUTBOX_DRAIN_INTERVAL", "2")),
+        # A backlog is picked up by the next tick anyway; don't pile up stale runs
+        "options": {"expires": 10},
+    },
+    "prune-outbox": {
+        "task": "core.tasks.prune_outbox",
+        "schedule": crontab(hour=3, minute=45),
+    },
+}
+
+# Write-behind buffer for socket chat messages (core/chat_buffer.py)
+CHAT_BUFFER_INTERVAL = float(os.getenv("CHAT_BUFFER_INTERVAL", "0.25"))
+CHAT_BUFFER_MAX_SIZE = int(os.getenv("CHAT_BUFFER_MAX_SIZE", "100"))
+
+# Typing indicators (core/presence.py), in seconds
+TYPING_MIN_INTERVAL = float(os.getenv("TYPING_MIN_INTERVAL", "0.5"))
+TYPING_REFRESH = float(os.getenv("TYPING_REFRESH", "3"))
+TYPING_TIMEOUT = float(os.getenv("TYPING_TIMEOUT", "5"))
+
+# Chat email digests (core/digests.py): seconds a digest waits for more messages
+CHAT_DIGEST_WINDOW = int(os.getenv("CHAT_DIGEST_WINDOW", "300"))
+
+# Transactional outbox (core/outbox.py). Drain inline after commit when no
+# worker/beat is running (defaults to on in DEBUG).
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+# A claimed batch not recorded within this many seconds is resent by another drainer
+OUTBOX_LEASE = timedelta(seconds=int(os.getenv("OUTBOX_LEASE_SECONDS", "300")))
+# In production the outbox is drained by beat ("drain-outbox") and run by the
+# worker (Procfile); draining in the request as well is a dev convenience
+OUTBOX_DRAIN_ON_COMMIT = get_bool("OUTBOX_DRAIN_ON_COMMIT", DEBUG)
+
+# Deadline reminder tiers, hours before the deadline (core/reminders.py)
+DEADLINE_REMINDER_TIERS = [float(h) for h in get_csv("DEADLINE_REMINDER_TIERS", ["24", "6", "1"])]
 
 # ─────────────────────────────────────────────────────────────────────────────
 # REST Framework + JWT
@@ -203,13 +281,17 @@ MEDIA_ROOT = BASE_DIR / "media"
 # ─────────────────────────────────────────────────────────────────────────────
 # Email (env-driven)
 # ─────────────────────────────────────────────────────────────────────────────
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
 EMAIL_USE_TLS = get_bool("EMAIL_USE_TLS", True)
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+# The outbox drainer keeps one session open per batch; don't let a stuck server hold it forever
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "20"))
+# Used by EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend (and bench_mail)
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", str(BASE_DIR / "tmp" / "emails"))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # i18n / tz